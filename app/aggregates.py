@@ -0,0 +1,158 @@
+from dataclasses import dataclass, field
+from datetime import date, datetime
+from functools import lru_cache
+from typing import Dict, List, Optional
+
+from sqlalchemy import Date, bindparam, cast, func, literal_column
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import ReportDailyRollup, counted_reports
+from app.timebuckets import BUCKET_UNITS, bucket_starts, current_bucket, with_current_bucket
+
+# Database department keys and how the dashboards display them
+DEPARTMENT_DISPLAY_NAMES = {
+    "water_dept": "Water Dept",
+    "road_dept": "Road Dept",
+    "sanitation_dept": "Sanitation Dept",
+    "electricity_dept": "Electricity Dept",
+    "other": "Other"
+}
+
+# Department ids used by the /api/departments/{dept_id} endpoints
+DEPARTMENT_IDS = {
+    1: "water_dept",
+    2: "road_dept",
+    3: "sanitation_dept",
+    4: "electricity_dept",
+    5: "other"
+}
+
+@dataclass
+class DepartmentCounts:
+    """Report counts per status for one department."""
+    department: str
+    by_status: Dict[str, int] = field(default_factory=dict)
+
+    @property
+    def total(self) -> int:
+        return sum(self.by_status.values())
+
+    @property
+    def resolved(self) -> int:
+        return self.by_status.get("Resolved", 0)
+
+    @property
+    def pending(self) -> int:
+        return self.by_status.get("Pending", 0)
+
+    @property
+    def progress(self) -> int:
+        return self.by_status.get("In Progress", 0)
+
+    @property
+    def efficiency(self) -> float:
+        """Resolved share of all issues, as an unrounded percentage."""
+        total = self.total
+        return (self.resolved / total * 100) if total > 0 else 0
+
+
+@dataclass
+class DepartmentSnapshot:
+    """Department x status counts, optionally split into time buckets."""
+    departments: Dict[str, DepartmentCounts] = field(default_factory=dict)
+    buckets: Dict[date, Dict[str, DepartmentCounts]] = field(default_factory=dict)
+    bucket_starts: List[date] = field(default_factory=list)
+
+    def get(self, department: str) -> DepartmentCounts:
+        return self.departments.get(department) or DepartmentCounts(department)
+
+    def get_bucket(self, bucket: date, department: str) -> DepartmentCounts:
+        return self.buckets.get(bucket, {}).get(department) or DepartmentCounts(department)
+
+    def efficiency_trend(self, department: str) -> List[float]:
+        """Efficiency per bucket, oldest first; empty buckets count as 0."""
+        return [round(self.get_bucket(start, department).efficiency, 1) for start in self.bucket_starts]
+
+
+@lru_cache(maxsize=None)
+def _department_counts_statement(bucket: Optional[str], with_since: bool):
+    # Built once per shape, with the start time as a bind parameter. Constants
+    # are inlined so the GROUP BY expressions match the select list
+    reports = counted_reports()
+    department = func.coalesce(reports.c.department, literal_column("'other'"))
+    columns = [department, reports.c.status, func.count(reports.c.id)]
+    if bucket:
+        period = cast(func.date_trunc(literal_column(f"'{bucket}'"), reports.c.created_at), Date)
+        columns.insert(0, period)
+
+    stmt = select(*columns)
+    if with_since:
+        stmt = stmt.where(reports.c.created_at >= bindparam("since"))
+    return stmt.group_by(*columns[:-1])
+
+
+async def load_department_snapshot(
+    db: AsyncSession,
+    since: Optional[datetime] = None,
+    bucket: Optional[str] = None
+) -> DepartmentSnapshot:
+    """
+    Counts live and archived reports by department and status in a single GROUP BY query.
+    With bucket (day/week/month/year) the counts are also split by the
+    created_at period; the overall totals are always filled in.
+    """
+    if bucket is not None and bucket not in BUCKET_UNITS:
+        raise ValueError(f"Bucket must be one of: {', '.join(BUCKET_UNITS)}")
+
+    stmt = _department_counts_statement(bucket, since is not None)
+    result = await db.execute(stmt, {"since": since} if since is not None else {})
+
+    snapshot = DepartmentSnapshot()
+    for row in result.all():
+        if bucket:
+            period_start, dept, report_status, count = row
+            bucket_counts = snapshot.buckets.setdefault(period_start, {})
+            counts = bucket_counts.setdefault(dept, DepartmentCounts(dept))
+            counts.by_status[report_status] = counts.by_status.get(report_status, 0) + count
+        else:
+            dept, report_status, count = row
+        totals = snapshot.departments.setdefault(dept, DepartmentCounts(dept))
+        totals.by_status[report_status] = totals.by_status.get(report_status, 0) + count
+    return snapshot
+
+
+async def load_department_trends(db: AsyncSession, unit: str, count: int) -> DepartmentSnapshot:
+    """
+    Department x status counts for the last count calendar buckets, read from
+    the daily rollup table so the cost does not grow with the reports table.
+    Each bucket holds the reports created in it, by their current status.
+    The buckets end at the database's current one.
+    """
+    if unit not in BUCKET_UNITS:
+        raise ValueError(f"Bucket must be one of: {', '.join(BUCKET_UNITS)}")
+
+    first = cast(current_bucket(unit) - literal_column(f"interval '1 {unit}'") * (count - 1), Date)
+    period = cast(func.date_trunc(literal_column(f"'{unit}'"), ReportDailyRollup.day), Date)
+    stmt = (
+        select(
+            period.label("period"),
+            ReportDailyRollup.department,
+            ReportDailyRollup.status,
+            func.sum(ReportDailyRollup.report_count).label("report_count")
+        )
+        .where(ReportDailyRollup.day >= first)
+        .group_by(period, ReportDailyRollup.department, ReportDailyRollup.status)
+    )
+    result = await db.execute(with_current_bucket(stmt, unit))
+    rows = result.all()
+
+    snapshot = DepartmentSnapshot(bucket_starts=bucket_starts(unit, count, rows[0].current_bucket))
+    for _, period_start, dept, report_status, count_sum in rows:
+        if period_start is None:
+            continue
+        counts = snapshot.buckets.setdefault(period_start, {}).setdefault(dept, DepartmentCounts(dept))
+        counts.by_status[report_status] = counts.by_status.get(report_status, 0) + int(count_sum)
+        totals = snapshot.departments.setdefault(dept, DepartmentCounts(dept))
+        totals.by_status[report_status] = totals.by_status.get(report_status, 0) + int(count_sum)
+    return snapshot
@@ -0,0 +1,168 @@
+import json
+import os
+import zlib
+from datetime import date, datetime, timedelta
+from typing import Iterable, Optional, Tuple
+
+from sqlalchemy import delete, exists, func, insert, text
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.cache import mark_changed
+from app.database import AsyncSessionLocal
+from app.models import Report, ReportArchive, ReportTombstone, Confirmation, ActivityLog
+from app.rollups import bump_reports_version
+
+# Resolved reports untouched for this long move to the archive
+ARCHIVE_AFTER_DAYS = int(os.getenv("ARCHIVE_AFTER_DAYS", "365"))
+# Reports moved per transaction
+ARCHIVE_BATCH_SIZE = int(os.getenv("ARCHIVE_BATCH_SIZE", "1000"))
+
+reports = Report.__table__
+archive = ReportArchive.__table__
+
+# Archive columns copied as-is; everything else lives only in the payload
+ARCHIVE_KEY_COLUMNS = [
+    column.name for column in archive.columns if column.name not in ("archived_at", "payload")
+]
+
+
+def _json_default(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    raise TypeError(f"Cannot archive value of type {type(value).__name__}")
+
+
+def pack_report(row: dict) -> bytes:
+    return zlib.compress(json.dumps(row, default=_json_default).encode(), 6)
+
+
+def unpack_report(payload: bytes) -> dict:
+    return json.loads(zlib.decompress(payload))
+
+
+def month_start(value: datetime) -> date:
+    return date(value.year, value.month, 1)
+
+
+def partition_name(month: date) -> str:
+    return f"{archive.name}_{month.year:04d}_{month.month:02d}"
+
+
+def archivable(cutoff: datetime):
+    """
+    WHERE clause for resolved reports last changed before cutoff. Reports that
+    confirmations or activity logs point at stay, as their foreign keys need them.
+    """
+    return (
+        (reports.c.status == "Resolved")
+        & (reports.c.updated_at < cutoff)
+        & reports.c.created_at.isnot(None)
+        & ~exists().where(Confirmation.report_id == reports.c.id)
+        & ~exists().where(ActivityLog.report_id == reports.c.id)
+    )
+
+
+async def ensure_archive_partitions(db: AsyncSession, months: Iterable[date]) -> int:
+    """
+    Creates the monthly archive partitions that do not exist yet. Returns how many were created.
+    """
+    created = 0
+    for month in sorted(set(months)):
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        name = partition_name(month)
+        exists_result = await db.execute(text("SELECT to_regclass(:name)"), {"name": name})
+        if exists_result.scalar() is not None:
+            continue
+        await db.execute(text(
+            f"CREATE TABLE IF NOT EXISTS {name} PARTITION OF {archive.name} "
+            f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+        ))
+        created += 1
+    return created
+
+
+async def archive_batch(db: AsyncSession, cutoff: datetime, limit: int) -> int:
+    """
+    Moves up to limit archivable reports into the archive in the caller's
+    transaction. Returns how many were moved.
+
+    Every dashboard count reads live and archived reports, so archiving
+    changes none of them; sync clients get tombstones and drop the reports
+    from maps and lists.
+    """
+    candidates = (
+        select(reports.c.id)
+        .where(archivable(cutoff))
+        .order_by(reports.c.id)
+        .limit(limit)
+        .with_for_update(skip_locked=True)
+    )
+    result = await db.execute(
+        delete(reports)
+        .where(reports.c.id.in_(candidates.scalar_subquery()))
+        .returning(*reports.columns)
+    )
+    rows = [dict(row._mapping) for row in result.all()]
+    if not rows:
+        return 0
+
+    await ensure_archive_partitions(db, [month_start(row["created_at"]) for row in rows])
+    await db.execute(insert(archive), [
+        {**{name: row[name] for name in ARCHIVE_KEY_COLUMNS}, "payload": pack_report(row)}
+        for row in rows
+    ])
+    await db.execute(insert(ReportTombstone), [{"report_id": row["id"]} for row in rows])
+
+    # The reports version is what the API workers check: list ETags and
+    # delta sync move on. The cache tag only reaches other processes with
+    # CACHE_BACKEND=redis; with the in-process cache, responses listing
+    # reports keep serving archived ones until their TTL runs out.
+    mark_changed(db)
+    await bump_reports_version(db)
+    return len(rows)
+
+
+async def archive_reports(after_days: int = ARCHIVE_AFTER_DAYS) -> int:
+    """
+    Archives every report resolved more than after_days ago, one batch per
+    transaction. Returns the number archived.
+    """
+    async with AsyncSessionLocal() as db:
+        cutoff = (await db.execute(select(func.localtimestamp()))).scalar() - timedelta(days=after_days)
+        # Partitions first, in their own short transaction: creating one locks the archive table
+        result = await db.execute(
+            select(func.date_trunc("month", reports.c.created_at).distinct()).where(archivable(cutoff))
+        )
+        await ensure_archive_partitions(db, [month_start(month) for month in result.scalars()])
+        await db.commit()
+
+        moved = 0
+        while True:
+            count = await archive_batch(db, cutoff, ARCHIVE_BATCH_SIZE)
+            await db.commit()
+            if not count:
+                return moved
+            moved += count
+
+
+async def load_archived_report(db: AsyncSession, report_id: int) -> Optional[dict]:
+    """
+    The full archived row of a report, or None if it is not archived.
+    """
+    result = await db.execute(select(archive.c.payload).where(archive.c.id == report_id))
+    payload = result.scalar()
+    if payload is None:
+        return None
+    return {**unpack_report(payload), "archived": True}
+
+
+async def archive_stats(db: AsyncSession) -> Tuple[int, int]:
+    """
+    Number of archived reports and partitions.
+    """
+    count = (await db.execute(select(func.count()).select_from(archive))).scalar() or 0
+    partitions = (await db.execute(text(
+        "SELECT count(*) FROM pg_inherits WHERE inhparent = to_regclass(:name)"
+    ), {"name": archive.name})).scalar() or 0
+    return count, partitions
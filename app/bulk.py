@@ -0,0 +1,140 @@
+from types import SimpleNamespace
+from typing import Dict, List, Sequence
+
+from sqlalchemy import Integer, any_, bindparam, delete, exists, func, insert, update
+from sqlalchemy.dialects.postgresql import ARRAY
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Report, ReportTombstone, Confirmation, ActivityLog
+from app.rollups import apply_report_changes, snapshot_report
+
+reports = Report.__table__
+
+# Columns snapshot_report reads, returned by bulk statements to apply rollups
+SNAPSHOT_COLUMNS = (
+    reports.c.department,
+    reports.c.status,
+    reports.c.location_lat,
+    reports.c.location_long,
+    reports.c.created_at,
+    reports.c.status_id,
+    reports.c.category_id,
+    reports.c.issue_type,
+    reports.c.auto_assigned,
+    reports.c.prediction_confidence,
+)
+
+# Per-id outcomes
+UPDATED = "updated"
+DELETED = "deleted"
+NOT_FOUND = "not_found"
+# Still referenced by confirmations or activity logs, so it cannot be deleted
+REFERENCED = "referenced"
+
+
+def _ids_param(ids: Sequence[int]):
+    # One array parameter however many ids there are
+    return bindparam("ids", list(ids), type_=ARRAY(Integer))
+
+
+def _locked_reports(ids: Sequence[int]):
+    """
+    CTE that locks the requested reports in id order and keeps their values
+    from before the statement. Locking in a fixed order keeps overlapping
+    bulk calls from deadlocking each other.
+    """
+    return (
+        select(reports.c.id, *SNAPSHOT_COLUMNS)
+        .where(reports.c.id == any_(_ids_param(ids)))
+        .order_by(reports.c.id)
+        .with_for_update()
+        .cte("locked_reports")
+    )
+
+
+def snapshot_row(row, prefix: str = ""):
+    """
+    Rollup snapshot of a row returned with SNAPSHOT_COLUMNS, read from the
+    columns labelled with prefix.
+    """
+    mapping = row._mapping
+    return snapshot_report(SimpleNamespace(**{
+        column.key: mapping[prefix + column.key] for column in SNAPSHOT_COLUMNS
+    }))
+
+
+def _outcomes(ids: Sequence[int], done: Sequence[int], outcome: str) -> Dict[int, str]:
+    done = set(done)
+    return {report_id: outcome if report_id in done else NOT_FOUND for report_id in ids}
+
+
+def group_outcomes(outcomes: Dict[int, str]) -> Dict[str, List[int]]:
+    """
+    Groups per-id outcomes into sorted id lists keyed by outcome.
+    """
+    grouped: Dict[str, List[int]] = {}
+    for report_id, outcome in sorted(outcomes.items()):
+        grouped.setdefault(outcome, []).append(report_id)
+    return grouped
+
+
+async def bulk_update_reports(db: AsyncSession, ids: Sequence[int], **values) -> Dict[int, str]:
+    """
+    Sets values on the given reports with one UPDATE ... RETURNING and applies
+    the rollup changes in the caller's transaction. Returns the outcome per id.
+    """
+    ids = sorted(set(ids))
+    if not ids:
+        return {}
+    locked = _locked_reports(ids)
+    stmt = (
+        update(reports)
+        .where(reports.c.id == locked.c.id)
+        .values(**values, updated_at=func.now())
+        .returning(
+            reports.c.id,
+            *SNAPSHOT_COLUMNS,
+            *(locked.c[column.key].label(f"old_{column.key}") for column in SNAPSHOT_COLUMNS),
+        )
+    )
+    rows = (await db.execute(stmt)).all()
+    await apply_report_changes(db, [(snapshot_row(row, "old_"), snapshot_row(row)) for row in rows])
+    return _outcomes(ids, [row.id for row in rows], UPDATED)
+
+
+async def bulk_delete_reports(db: AsyncSession, ids: Sequence[int]) -> Dict[int, str]:
+    """
+    Deletes the given reports with one DELETE ... RETURNING, leaving tombstones
+    for delta sync and applying the rollup changes in the caller's transaction.
+    Reports that confirmations or activity logs still point at are kept.
+    """
+    ids = sorted(set(ids))
+    if not ids:
+        return {}
+    locked = _locked_reports(ids)
+    stmt = (
+        delete(reports)
+        .where(reports.c.id == locked.c.id)
+        .where(~exists().where(Confirmation.report_id == reports.c.id))
+        .where(~exists().where(ActivityLog.report_id == reports.c.id))
+        .returning(reports.c.id, *SNAPSHOT_COLUMNS)
+    )
+    rows = (await db.execute(stmt)).all()
+    deleted = [row.id for row in rows]
+    outcomes = _outcomes(ids, deleted, DELETED)
+
+    if deleted:
+        await apply_report_changes(db, [(snapshot_row(row), None) for row in rows])
+        await db.execute(
+            insert(ReportTombstone).from_select(
+                ["report_id"], select(func.unnest(_ids_param(deleted)))
+            )
+        )
+
+    kept = [report_id for report_id, outcome in outcomes.items() if outcome == NOT_FOUND]
+    if kept:
+        result = await db.execute(select(reports.c.id).where(reports.c.id == any_(_ids_param(kept))))
+        for report_id in result.scalars():
+            outcomes[report_id] = REFERENCED
+    return outcomes
@@ -0,0 +1,243 @@
+import asyncio
+import functools
+import json
+import os
+import time
+from collections import OrderedDict
+from typing import Dict, Iterable, Optional, Sequence
+
+from fastapi.encoders import jsonable_encoder
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.orm import Session
+
+from app.models import Report
+from app.singleflight import call_in_own_session, flight, request_key
+from app.singleflight import metrics as single_flight_metrics
+
+try:
+    import redis.asyncio as redis_asyncio
+except ImportError:  # redis is only needed for CACHE_BACKEND=redis
+    redis_asyncio = None
+
+CACHE_ENABLED = os.getenv("CACHE_ENABLED", "true").lower() not in ("0", "false", "no")
+CACHE_BACKEND = os.getenv("CACHE_BACKEND", "memory")
+CACHE_MAX_ENTRIES = int(os.getenv("CACHE_MAX_ENTRIES", "1024"))
+REDIS_URL = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
+# Tag for every cached response derived from the reports table
+REPORTS_TAG = "reports"
+
+# session.info key collecting the tags to invalidate when the session commits
+PENDING_TAGS_KEY = "cache_tags"
+
+
+class MemoryBackend:
+    """
+    In-process LRU cache. Tags are version counters; an entry remembers the
+    versions it was computed at and is ignored once any of them moves on.
+    """
+    name = "memory"
+
+    def __init__(self, max_entries: int):
+        self.max_entries = max_entries
+        self.entries: "OrderedDict[str, dict]" = OrderedDict()
+        self.tag_versions: Dict[str, int] = {}
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        entry = self.entries.get(key)
+        if entry is None:
+            return None
+        if entry["stale_until"] <= time.time():
+            del self.entries[key]
+            return None
+        self.entries.move_to_end(key)
+        return entry
+
+    async def set(self, key: str, entry: dict, ttl: float):
+        self.entries[key] = entry
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+            self.evictions += 1
+
+    async def get_tag_versions(self, tags: Sequence[str]) -> Dict[str, int]:
+        return {tag: self.tag_versions.get(tag, 0) for tag in tags}
+
+    def bump_tags_nowait(self, tags: Iterable[str]):
+        for tag in tags:
+            self.tag_versions[tag] = self.tag_versions.get(tag, 0) + 1
+
+    def size(self) -> int:
+        return len(self.entries)
+
+
+class RedisBackend:
+    """
+    Shared cache in Redis, so every worker sees the same entries and tag
+    invalidations. Entries expire through Redis TTLs.
+    """
+    name = "redis"
+
+    def __init__(self, url: str, prefix: str = "urban-cache:"):
+        self.client = redis_asyncio.from_url(url)
+        self.prefix = prefix
+        self.evictions = 0
+
+    async def get(self, key: str) -> Optional[dict]:
+        raw = await self.client.get(self.prefix + key)
+        return json.loads(raw) if raw is not None else None
+
+    async def set(self, key: str, entry: dict, ttl: float):
+        await self.client.set(self.prefix + key, json.dumps(entry), ex=max(1, int(ttl)))
+
+    async def get_tag_versions(self, tags: Sequence[str]) -> Dict[str, int]:
+        if not tags:
+            return {}
+        values = await self.client.mget([f"{self.prefix}tag:{tag}" for tag in tags])
+        return {tag: int(value or 0) for tag, value in zip(tags, values)}
+
+    async def bump_tags(self, tags: Iterable[str]):
+        pipe = self.client.pipeline()
+        for tag in tags:
+            pipe.incr(f"{self.prefix}tag:{tag}")
+        await pipe.execute()
+
+    def bump_tags_nowait(self, tags: Iterable[str]):
+        asyncio.get_running_loop().create_task(self.bump_tags(list(tags)))
+
+    def size(self) -> Optional[int]:
+        return None
+
+
+def _create_backend():
+    if CACHE_BACKEND == "redis":
+        if redis_asyncio is None:
+            print("⚠️ CACHE_BACKEND=redis but the redis package is not installed; using the in-process cache")
+        else:
+            return RedisBackend(REDIS_URL)
+    return MemoryBackend(CACHE_MAX_ENTRIES)
+
+
+backend = _create_backend()
+
+metrics = {
+    "hits": 0,
+    "stale_hits": 0,
+    "misses": 0,
+    "refreshes": 0,
+    "refresh_errors": 0,
+    "invalidations": 0,
+}
+
+# Keys with a background refresh in flight, so a stale entry is refreshed once
+_refreshing = set()
+
+
+async def _compute(func, key: str, tags: Sequence[str], ttl: float, stale: float, args, kwargs):
+    # Read tag versions before computing, so a write that commits meanwhile
+    # leaves the new entry already outdated rather than wrongly fresh
+    versions = await backend.get_tag_versions(tags)
+    value = jsonable_encoder(await call_in_own_session(func, args, kwargs))
+    now = time.time()
+    entry = {
+        "value": value,
+        "tags": versions,
+        "fresh_until": now + ttl,
+        "stale_until": now + ttl + stale,
+    }
+    await backend.set(key, entry, ttl + stale)
+    return value
+
+
+async def _refresh(func, key: str, tags: Sequence[str], ttl: float, stale: float, args, kwargs):
+    try:
+        await flight.do(key, lambda: _compute(func, key, tags, ttl, stale, args, kwargs))
+        metrics["refreshes"] += 1
+    except Exception as e:
+        metrics["refresh_errors"] += 1
+        print(f"❌ Cache refresh failed for {key}: {e}")
+    finally:
+        _refreshing.discard(key)
+
+
+def cached(ttl: float, tags: Sequence[str] = (REPORTS_TAG,), stale: float = 0):
+    """
+    Caches an endpoint's response per query parameters for ttl seconds.
+    Entries are dropped when any of their tags is invalidated by a commit.
+    For stale seconds after expiry the old response is still served while
+    one background task recomputes it. Concurrent misses for the same key
+    share a single computation, which runs on its own session.
+    """
+    tags = list(tags)
+
+    def decorator(func):
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if not CACHE_ENABLED:
+                return await func(*args, **kwargs)
+
+            key = request_key(func, kwargs)
+            entry = await backend.get(key)
+            if entry is not None and entry["tags"] == await backend.get_tag_versions(tags):
+                now = time.time()
+                if now < entry["fresh_until"]:
+                    metrics["hits"] += 1
+                    return entry["value"]
+                if now < entry["stale_until"]:
+                    metrics["stale_hits"] += 1
+                    if key not in _refreshing:
+                        _refreshing.add(key)
+                        asyncio.create_task(_refresh(func, key, tags, ttl, stale, args, kwargs))
+                    return entry["value"]
+
+            metrics["misses"] += 1
+            return await flight.do(key, lambda: _compute(func, key, tags, ttl, stale, args, kwargs))
+
+        return wrapper
+
+    return decorator
+
+
+def mark_changed(db: AsyncSession, *tags: str):
+    """
+    Invalidates tags once the session's transaction commits.
+    """
+    db.sync_session.info.setdefault(PENDING_TAGS_KEY, set()).update(tags or (REPORTS_TAG,))
+
+
+@event.listens_for(Session, "after_flush")
+def _collect_report_writes(session, flush_context):
+    # Catch ORM writes to reports that do not go through apply_report_changes
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Report):
+            session.info.setdefault(PENDING_TAGS_KEY, set()).add(REPORTS_TAG)
+            return
+
+
+@event.listens_for(Session, "after_commit")
+def _invalidate_after_commit(session):
+    tags = session.info.pop(PENDING_TAGS_KEY, None)
+    if tags:
+        metrics["invalidations"] += 1
+        backend.bump_tags_nowait(tags)
+
+
+@event.listens_for(Session, "after_rollback")
+def _discard_after_rollback(session):
+    session.info.pop(PENDING_TAGS_KEY, None)
+
+
+def cache_metrics() -> dict:
+    lookups = metrics["hits"] + metrics["stale_hits"] + metrics["misses"]
+    return {
+        "enabled": CACHE_ENABLED,
+        "backend": backend.name,
+        **metrics,
+        "hit_rate": round((metrics["hits"] + metrics["stale_hits"]) / lookups * 100, 1) if lookups > 0 else 0,
+        "entries": backend.size(),
+        "max_entries": CACHE_MAX_ENTRIES if backend.name == "memory" else None,
+        "evictions": backend.evictions,
+        "single_flight": dict(single_flight_metrics),
+    }
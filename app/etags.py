@@ -0,0 +1,37 @@
+import hashlib
+import json
+from typing import Optional
+
+from fastapi import Response
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.rollups import REPORTS_VERSION, read_counters
+
+
+async def reports_etag(db: AsyncSession, scope: str, params: dict) -> str:
+    """
+    Strong ETag for a response over reports: the reports write counter plus
+    a digest of the request parameters. Read it before the data, so the
+    data is never older than the version it is labelled with.
+    """
+    counters = await read_counters(db, names=[REPORTS_VERSION])
+    digest = hashlib.sha1(json.dumps(params, sort_keys=True, default=str).encode()).hexdigest()[:16]
+    return f'"{scope}-{counters.get(REPORTS_VERSION, 0)}-{digest}"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """
+    Whether an If-None-Match header matches the ETag (weak comparison, as
+    RFC 9110 specifies for If-None-Match).
+    """
+    if not if_none_match:
+        return False
+    for candidate in if_none_match.split(","):
+        candidate = candidate.strip()
+        if candidate == "*" or candidate.removeprefix("W/") == etag:
+            return True
+    return False
+
+
+def not_modified(etag: str) -> Response:
+    return Response(status_code=304, headers={"ETag": etag})
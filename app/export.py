@@ -0,0 +1,104 @@
+import csv
+import io
+import json
+import os
+from datetime import date, datetime, timezone
+from typing import AsyncIterator, List, Optional
+
+from sqlalchemy.future import select
+
+from app.database import ReadSnapshotSessionLocal
+from app.models import Report
+
+# Rows fetched per round trip from the server-side cursor
+EXPORT_BATCH_SIZE = int(os.getenv("EXPORT_BATCH_SIZE", "2000"))
+
+# Columns analysts may export, in default output order
+EXPORT_COLUMNS = {
+    column.key: column
+    for column in (
+        Report.id,
+        Report.title,
+        Report.description,
+        Report.category,
+        Report.issue_type,
+        Report.urgency_level,
+        Report.status,
+        Report.department,
+        Report.assigned_department,
+        Report.auto_assigned,
+        Report.prediction_confidence,
+        Report.ward,
+        Report.location_lat,
+        Report.location_long,
+        Report.location_address,
+        Report.user_name,
+        Report.user_email,
+        Report.user_mobile,
+        Report.resolution_notes,
+        Report.resolved_by,
+        Report.created_at,
+        Report.updated_at,
+    )
+}
+
+EXPORT_FORMATS = {
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv",
+}
+
+
+def parse_export_columns(columns: Optional[str]) -> List[str]:
+    """
+    Parses a comma-separated column selection. Raises ValueError for unknown columns.
+    """
+    if not columns:
+        return list(EXPORT_COLUMNS)
+    selected = [name.strip() for name in columns.split(",") if name.strip()]
+    unknown = [name for name in selected if name not in EXPORT_COLUMNS]
+    if unknown or not selected:
+        raise ValueError(f"Unknown columns: {', '.join(unknown)}. Valid columns: {', '.join(EXPORT_COLUMNS)}")
+    return selected
+
+
+def naive_utc(value: datetime) -> datetime:
+    """
+    Converts an aware datetime to the naive UTC form stored in created_at.
+    """
+    if value.tzinfo is not None:
+        return value.astimezone(timezone.utc).replace(tzinfo=None)
+    return value
+
+
+def _plain(value):
+    if isinstance(value, (datetime, date)):
+        return value.isoformat()
+    return value
+
+
+async def stream_reports_export(columns: List[str], filters: list, format: str) -> AsyncIterator[bytes]:
+    """
+    Yields the export in chunks of one cursor batch each. The generator owns
+    its session, which outlives the request handler that returns the stream.
+    """
+    stmt = select(*(EXPORT_COLUMNS[name] for name in columns)).where(*filters).order_by(Report.id)
+    async with ReadSnapshotSessionLocal() as session:
+        result = await session.stream(stmt.execution_options(yield_per=EXPORT_BATCH_SIZE))
+
+        if format == "csv":
+            buffer = io.StringIO()
+            writer = csv.writer(buffer)
+            writer.writerow(columns)
+            yield buffer.getvalue().encode()
+            async for rows in result.partitions():
+                buffer.seek(0)
+                buffer.truncate()
+                writer.writerows([_plain(value) for value in row] for row in rows)
+                yield buffer.getvalue().encode()
+        else:
+            async for rows in result.partitions():
+                lines = [
+                    json.dumps({name: _plain(value) for name, value in zip(columns, row)})
+                    for row in rows
+                ]
+                yield ("\n".join(lines) + "\n").encode()
@@ -0,0 +1,188 @@
+import math
+from typing import List, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_M = 6371000.0
+
+# A ring is a closed sequence of (lat, long) vertices; the last vertex may
+# repeat the first one or not, both are handled.
+Ring = Sequence[Sequence[float]]
+
+
+def rings_bounds(rings: Sequence[Ring]) -> Tuple[float, float, float, float]:
+    """
+    Returns (south, north, west, east) covering every vertex of the rings.
+    """
+    lats = [point[0] for ring in rings for point in ring]
+    longs = [point[1] for ring in rings for point in ring]
+    return min(lats), max(lats), min(longs), max(longs)
+
+
+def _ring_edges(rings: Sequence[Ring]) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    starts, ends = [], []
+    for ring in rings:
+        vertices = np.asarray(ring, dtype=float)
+        starts.append(vertices)
+        ends.append(np.roll(vertices, -1, axis=0))
+    start = np.concatenate(starts)
+    end = np.concatenate(ends)
+    return start[:, 0], start[:, 1], end[:, 0], end[:, 1]
+
+
+def points_in_polygon(lats: np.ndarray, longs: np.ndarray, rings: Sequence[Ring]) -> np.ndarray:
+    """
+    Even-odd point-in-polygon test for many points at once.
+    The first ring is the outer boundary; further rings are holes.
+    """
+    lats = np.asarray(lats, dtype=float)
+    longs = np.asarray(longs, dtype=float)
+    inside = np.zeros(len(lats), dtype=bool)
+    if not len(lats):
+        return inside
+
+    # Sort points by latitude so each edge only touches the points in its
+    # latitude band instead of every point
+    order = np.argsort(lats, kind="stable")
+    sorted_lats = lats[order]
+    sorted_longs = longs[order]
+
+    lat1, long1, lat2, long2 = _ring_edges(rings)
+    band_start = np.searchsorted(sorted_lats, np.minimum(lat1, lat2), side="left")
+    band_stop = np.searchsorted(sorted_lats, np.maximum(lat1, lat2), side="left")
+
+    parity = np.zeros(len(lats), dtype=bool)
+    for edge in np.nonzero(band_stop > band_start)[0]:
+        start, stop = band_start[edge], band_stop[edge]
+        band_lats = sorted_lats[start:stop]
+        crossing_long = long1[edge] + (band_lats - lat1[edge]) * (long2[edge] - long1[edge]) / (lat2[edge] - lat1[edge])
+        parity[start:stop] ^= sorted_longs[start:stop] < crossing_long
+
+    inside[order] = parity
+    return inside
+
+
+def point_in_rings(lat: float, long: float, rings: Sequence[Ring]) -> bool:
+    """
+    Even-odd point-in-polygon test for a single point, without numpy overhead.
+    """
+    inside = False
+    for ring in rings:
+        count = len(ring)
+        for i in range(count):
+            lat1, long1 = ring[i][0], ring[i][1]
+            lat2, long2 = ring[(i + 1) % count][0], ring[(i + 1) % count][1]
+            if (lat1 > lat) != (lat2 > lat):
+                if long < long1 + (lat - lat1) * (long2 - long1) / (lat2 - lat1):
+                    inside = not inside
+    return inside
+
+
+def points_near_polyline(lats: np.ndarray, longs: np.ndarray, path: Ring, buffer_m: float) -> np.ndarray:
+    """
+    Returns a mask of points within buffer_m metres of the polyline.
+    Uses an equirectangular projection around the path, fine for city scales.
+    """
+    lats = np.asarray(lats, dtype=float)
+    longs = np.asarray(longs, dtype=float)
+    near = np.zeros(len(lats), dtype=bool)
+    if not len(lats):
+        return near
+
+    vertices = np.asarray(path, dtype=float)
+    metres_per_deg_lat = math.pi / 180 * EARTH_RADIUS_M
+    metres_per_deg_long = metres_per_deg_lat * math.cos(math.radians(vertices[:, 0].mean()))
+    buffer_deg_lat = buffer_m / metres_per_deg_lat
+
+    order = np.argsort(lats, kind="stable")
+    sorted_y = lats[order] * metres_per_deg_lat
+    sorted_x = longs[order] * metres_per_deg_long
+    sorted_lats = lats[order]
+
+    path_y = vertices[:, 0] * metres_per_deg_lat
+    path_x = vertices[:, 1] * metres_per_deg_long
+    band_start = np.searchsorted(sorted_lats, np.minimum(vertices[:-1, 0], vertices[1:, 0]) - buffer_deg_lat, side="left")
+    band_stop = np.searchsorted(sorted_lats, np.maximum(vertices[:-1, 0], vertices[1:, 0]) + buffer_deg_lat, side="right")
+
+    hit = np.zeros(len(lats), dtype=bool)
+    for segment in range(len(vertices) - 1):
+        start, stop = band_start[segment], band_stop[segment]
+        if stop <= start:
+            continue
+        ax, ay = path_x[segment], path_y[segment]
+        dx, dy = path_x[segment + 1] - ax, path_y[segment + 1] - ay
+        px = sorted_x[start:stop] - ax
+        py = sorted_y[start:stop] - ay
+        length_sq = dx * dx + dy * dy
+        # Project onto the segment and clamp to its end points
+        t = np.clip((px * dx + py * dy) / length_sq, 0.0, 1.0) if length_sq else np.zeros(len(px))
+        distance_sq = (px - t * dx) ** 2 + (py - t * dy) ** 2
+        hit[start:stop] |= distance_sq <= buffer_m * buffer_m
+
+    near[order] = hit
+    return near
+
+
+def polyline_bounds(path: Ring, buffer_m: float) -> Tuple[float, float, float, float]:
+    """
+    Returns (south, north, west, east) of the polyline grown by buffer_m.
+    """
+    south, north, west, east = rings_bounds([path])
+    buffer_lat = buffer_m / (math.pi / 180 * EARTH_RADIUS_M)
+    widest_lat = max(abs(south), abs(north)) + buffer_lat
+    buffer_long = buffer_lat / max(math.cos(math.radians(min(widest_lat, 89.0))), 1e-6)
+    return south - buffer_lat, north + buffer_lat, west - buffer_long, east + buffer_long
+
+
+class STRTree:
+    """
+    Static R-tree bulk-loaded with Sort-Tile-Recursive packing.
+    Items are (bounds, value) with bounds as (south, north, west, east).
+    """
+
+    def __init__(self, items: List[Tuple[Tuple[float, float, float, float], object]], node_capacity: int = 16):
+        self.node_capacity = node_capacity
+        self.size = len(items)
+        level = [(bounds, value, None) for bounds, value in items]
+        while len(level) > node_capacity:
+            level = self._pack(level)
+        self.root = (self._union([entry[0] for entry in level]), None, level) if level else None
+
+    def _pack(self, entries):
+        slices = math.ceil(math.sqrt(math.ceil(len(entries) / self.node_capacity)))
+        per_slice = slices * self.node_capacity
+        entries = sorted(entries, key=lambda entry: (entry[0][2] + entry[0][3]) / 2)
+        parents = []
+        for i in range(0, len(entries), per_slice):
+            vertical = sorted(entries[i:i + per_slice], key=lambda entry: (entry[0][0] + entry[0][1]) / 2)
+            for j in range(0, len(vertical), self.node_capacity):
+                children = vertical[j:j + self.node_capacity]
+                parents.append((self._union([child[0] for child in children]), None, children))
+        return parents
+
+    @staticmethod
+    def _union(bounds_list):
+        return (
+            min(bounds[0] for bounds in bounds_list),
+            max(bounds[1] for bounds in bounds_list),
+            min(bounds[2] for bounds in bounds_list),
+            max(bounds[3] for bounds in bounds_list),
+        )
+
+    def query_point(self, lat: float, long: float) -> List[object]:
+        """
+        Returns the values whose bounds contain the point.
+        """
+        if self.root is None:
+            return []
+        found = []
+        stack = [self.root]
+        while stack:
+            bounds, value, children = stack.pop()
+            if not (bounds[0] <= lat <= bounds[1] and bounds[2] <= long <= bounds[3]):
+                continue
+            if children is None:
+                found.append(value)
+            else:
+                stack.extend(children)
+        return found
@@ -0,0 +1,174 @@
+import asyncio
+import os
+from typing import Callable, Iterable, List, NamedTuple, Optional, Sequence, Tuple
+
+from pydantic import ValidationError
+from sqlalchemy import func, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.export import naive_utc
+from app.models import Report
+from app.rollups import ReportSnapshot, apply_report_changes
+from app.schemas import ReportIngest
+from app.wards import get_ward_index
+
+# Rows per COPY; the CLI also commits once per batch
+INGEST_BATCH_SIZE = int(os.getenv("INGEST_BATCH_SIZE", "5000"))
+# Rows accepted by one API call
+INGEST_MAX_ROWS = int(os.getenv("INGEST_MAX_ROWS", "50000"))
+# Same bar as /api/ai/auto-assign for taking a predicted department
+INGEST_MIN_CONFIDENCE = float(os.getenv("INGEST_MIN_CONFIDENCE", "50"))
+
+# Columns written for every row, in record order. Ids are drawn from the
+# reports sequence up front because COPY cannot return them.
+INGEST_COLUMNS = (
+    "id",
+    "user_name",
+    "user_mobile",
+    "user_email",
+    "title",
+    "description",
+    "issue_type",
+    "category",
+    "urgency_level",
+    "status",
+    "location_lat",
+    "location_long",
+    "location_address",
+    "ward",
+    "department",
+    "auto_assigned",
+    "prediction_confidence",
+    "created_at",
+    "updated_at",
+)
+
+# Takes descriptions, returns a (department, confidence percent) per description
+Predictor = Callable[[List[str]], List[Tuple[str, float]]]
+
+
+class IngestResult(NamedTuple):
+    report_ids: List[int]
+    # (row number, messages) for every row that was not inserted
+    errors: List[Tuple[int, List[str]]]
+
+
+def validate_rows(rows: Iterable[Tuple[int, object]]) -> Tuple[List[Tuple[int, ReportIngest]], List[Tuple[int, List[str]]]]:
+    """
+    Validates numbered raw rows. Returns the valid rows and the errors of the rest.
+    """
+    valid, errors = [], []
+    for number, raw in rows:
+        if not isinstance(raw, dict):
+            errors.append((number, ["Row must be an object"]))
+            continue
+        try:
+            valid.append((number, ReportIngest(**raw)))
+        except ValidationError as e:
+            errors.append((number, [
+                f"{'.'.join(str(part) for part in error['loc'])}: {error['msg']}"
+                for error in e.errors()
+            ]))
+    return valid, errors
+
+
+async def predict_departments(reports: Sequence[ReportIngest], predictor: Predictor):
+    """
+    Assigns predicted departments to rows without one, in a single batched
+    prediction off the event loop.
+    """
+    pending = [report for report in reports if report.department == "other"]
+    if not pending:
+        return
+    predictions = await asyncio.to_thread(predictor, [report.description for report in pending])
+    for report, (department, confidence) in zip(pending, predictions):
+        if department != "other" and confidence > INGEST_MIN_CONFIDENCE:
+            report.department = department
+            report.auto_assigned = True
+            report.prediction_confidence = confidence
+
+
+async def _copy_records(db: AsyncSession, records: List[tuple]):
+    connection = await db.connection()
+    raw = (await connection.get_raw_connection()).driver_connection
+    if hasattr(raw, "copy_records_to_table"):
+        # asyncpg: binary COPY inside the session's transaction
+        await raw.copy_records_to_table(Report.__tablename__, records=records, columns=list(INGEST_COLUMNS))
+    else:
+        await db.execute(insert(Report.__table__), [dict(zip(INGEST_COLUMNS, record)) for record in records])
+
+
+async def insert_reports(db: AsyncSession, reports: Sequence[ReportIngest]) -> List[int]:
+    """
+    Inserts validated reports in the caller's transaction and applies their
+    rollups. Returns the new ids in input order.
+    """
+    if not reports:
+        return []
+    id_sequence = func.pg_get_serial_sequence(Report.__tablename__, "id")
+    result = await db.execute(
+        select(func.nextval(id_sequence)).select_from(func.generate_series(1, len(reports)))
+    )
+    ids = list(result.scalars().all())
+    # The clock that fills created_at for reports filed through the API
+    now = (await db.execute(select(func.localtimestamp()))).scalar()
+
+    wards = get_ward_index()
+    records, changes = [], []
+    for report_id, report in zip(ids, reports):
+        created_at = naive_utc(report.created_at) if report.created_at else now
+        records.append((
+            report_id,
+            report.user_name,
+            report.user_mobile,
+            report.user_email,
+            report.title,
+            report.description,
+            "General",
+            "General",
+            report.urgency_level,
+            report.status,
+            report.location_lat,
+            report.location_long,
+            report.location_address,
+            wards.lookup(report.location_lat, report.location_long),
+            report.department,
+            bool(report.auto_assigned),
+            report.prediction_confidence,
+            created_at,
+            # Stamped now even for back-dated rows so delta-sync cursors pick them up
+            now,
+        ))
+        changes.append((None, ReportSnapshot(
+            department=report.department,
+            status=report.status,
+            location_lat=report.location_lat,
+            location_long=report.location_long,
+            created_day=created_at.date(),
+            auto_assigned=bool(report.auto_assigned),
+            prediction_confidence=report.prediction_confidence,
+        )))
+
+    await _copy_records(db, records)
+    await apply_report_changes(db, changes)
+    return ids
+
+
+async def ingest_reports(
+    db: AsyncSession,
+    rows: Iterable[Tuple[int, object]],
+    predictor: Optional[Predictor] = None
+) -> IngestResult:
+    """
+    Validates numbered raw rows and inserts the valid ones in batches of
+    INGEST_BATCH_SIZE within the caller's transaction.
+    """
+    valid, errors = validate_rows(rows)
+    reports = [report for _, report in valid]
+    if predictor is not None:
+        await predict_departments(reports, predictor)
+    report_ids = []
+    for start in range(0, len(reports), INGEST_BATCH_SIZE):
+        report_ids.extend(await insert_reports(db, reports[start:start + INGEST_BATCH_SIZE]))
+    return IngestResult(report_ids, errors)
@@ -0,0 +1,58 @@
+from typing import Iterable, List, Optional
+
+from app.models import Report
+
+# Columns needed to draw a marker; fetched as plain rows for the columnar format
+COLUMNAR_COLUMNS = (
+    Report.id,
+    Report.location_lat,
+    Report.location_long,
+    Report.status,
+    Report.urgency_level,
+)
+
+# Codes are stable for the known values; anything else is appended per response
+STATUS_VALUES = ["Pending", "In Progress", "Resolved"]
+URGENCY_VALUES = ["Low", "Medium", "High", "Urgent"]
+
+
+def build_columnar_payload(
+    rows: Iterable,
+    deleted_ids: Optional[List[int]] = None,
+    cursor: Optional[str] = None,
+    has_more: bool = False,
+    next_cursor: Optional[str] = None
+) -> dict:
+    """
+    Packs (id, lat, long, status, urgency, ...) rows into parallel arrays.
+    Status and urgency are sent as small integer codes into the *_values lists.
+    """
+    status_codes = {value: code for code, value in enumerate(STATUS_VALUES)}
+    urgency_codes = {value: code for code, value in enumerate(URGENCY_VALUES)}
+
+    ids, lats, longs, statuses, urgencies = [], [], [], [], []
+    for row in rows:
+        report_id, lat, long, status, urgency = row[:5]
+        status = status or "Pending"
+        urgency = urgency or "Medium"
+        ids.append(report_id)
+        lats.append(lat)
+        longs.append(long)
+        statuses.append(status_codes.setdefault(status, len(status_codes)))
+        urgencies.append(urgency_codes.setdefault(urgency, len(urgency_codes)))
+
+    return {
+        "format": "columnar",
+        "count": len(ids),
+        "ids": ids,
+        "lat": lats,
+        "long": longs,
+        "status": statuses,
+        "urgency": urgencies,
+        "status_values": list(status_codes),
+        "urgency_values": list(urgency_codes),
+        "deleted_ids": deleted_ids or [],
+        "cursor": cursor,
+        "has_more": has_more,
+        "next_cursor": next_cursor
+    }
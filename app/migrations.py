@@ -0,0 +1,202 @@
+import hashlib
+import json
+import os
+from typing import Dict, Optional, Set, Tuple
+
+from sqlalchemy import Index, UniqueConstraint, text
+from sqlalchemy.dialects.postgresql import insert
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncConnection
+from sqlalchemy.schema import CreateIndex
+
+from app.database import Base
+from app.models import SchemaVersion
+
+# What startup does when the database was migrated to other models:
+# "strict" refuses to start, "warn" logs and starts, "off" skips the check.
+# A database that was never migrated has no tables, so only "off" starts on it.
+SCHEMA_CHECK = os.getenv("SCHEMA_CHECK", "warn").lower()
+
+# Indexes the models no longer declare, dropped by migrate
+OBSOLETE_INDEXES = (
+    # Superseded by ix_reports_updated_at_id
+    "ix_reports_updated_at",
+)
+
+# Serializes concurrent "migrate" runs
+MIGRATION_LOCK_ID = 4702
+
+# How long one DDL statement waits for its table lock before migrate fails
+MIGRATION_LOCK_TIMEOUT = os.getenv("MIGRATION_LOCK_TIMEOUT", "5s")
+
+
+def schema_fingerprint() -> str:
+    """
+    Digest of the tables, columns, indexes and constraints the models declare.
+    Any model change that needs DDL changes it.
+    """
+    tables = {}
+    for table in sorted(Base.metadata.tables.values(), key=lambda t: t.name):
+        tables[table.name] = {
+            "columns": [
+                [
+                    column.name,
+                    str(column.type),
+                    column.nullable,
+                    column.primary_key,
+                    str(column.server_default.arg) if column.server_default is not None else None,
+                    sorted(fk.target_fullname for fk in column.foreign_keys),
+                ]
+                for column in table.columns
+            ],
+            "indexes": sorted(
+                [index.name, [column.name for column in index.columns], bool(index.unique)]
+                for index in table.indexes
+            ),
+            "unique": sorted(
+                [constraint.name or "", sorted(column.name for column in constraint.columns)]
+                for constraint in table.constraints
+                if isinstance(constraint, UniqueConstraint)
+            ),
+        }
+    return hashlib.sha256(json.dumps(tables, sort_keys=True).encode()).hexdigest()
+
+
+async def stored_fingerprint(conn: AsyncConnection) -> Optional[str]:
+    """
+    The fingerprint the database was last migrated to, or None if it never was.
+    """
+    try:
+        result = await conn.execute(text("SELECT fingerprint FROM schema_version WHERE id = 1"))
+        return result.scalar()
+    except DBAPIError:
+        # No schema_version table yet
+        return None
+
+
+async def check_schema(conn: AsyncConnection) -> bool:
+    """
+    Compares the stored fingerprint with the models in one query. Warns on a
+    mismatch, or raises RuntimeError when SCHEMA_CHECK is "strict" or the
+    database was never migrated.
+    """
+    if SCHEMA_CHECK == "off":
+        return True
+    stored = await stored_fingerprint(conn)
+    expected = schema_fingerprint()
+    if stored == expected:
+        return True
+    message = (
+        "Database schema has not been migrated" if stored is None
+        else f"Database schema {stored[:12]} does not match the models ({expected[:12]})"
+    ) + "; run `python maintenance.py migrate`"
+    if SCHEMA_CHECK == "strict" or stored is None:
+        raise RuntimeError(message)
+    print(f"⚠️ {message}")
+    return False
+
+
+async def _existing_schema(conn: AsyncConnection) -> Tuple[Dict[str, Set[str]], Dict[str, bool]]:
+    """
+    Columns per existing table, and each existing index with whether it is
+    valid (a failed CREATE INDEX CONCURRENTLY leaves an invalid one behind).
+    """
+    result = await conn.execute(text(
+        "SELECT table_name, column_name FROM information_schema.columns "
+        "WHERE table_schema = current_schema()"
+    ))
+    columns = {}
+    for table_name, column_name in result.all():
+        columns.setdefault(table_name, set()).add(column_name)
+
+    result = await conn.execute(text(
+        "SELECT c.relname, i.indisvalid FROM pg_index i "
+        "JOIN pg_class c ON c.oid = i.indexrelid "
+        "WHERE c.relnamespace = current_schema()::regnamespace"
+    ))
+    return columns, dict(result.all())
+
+
+def _create_index(index: Index, dialect) -> str:
+    sql = str(CreateIndex(index, if_not_exists=True).compile(dialect=dialect))
+    if index.table.dialect_options["postgresql"].get("partition_by"):
+        # Partitioned tables cannot build indexes concurrently
+        return sql
+    return sql.replace("INDEX ", "INDEX CONCURRENTLY ", 1)
+
+
+async def migrate_schema(conn: AsyncConnection) -> Tuple[str, int]:
+    """
+    Brings the database up to the models and stores the new fingerprint.
+    The models are diffed against the catalog first and only the missing
+    DDL runs, one statement per transaction, with indexes on existing tables
+    built CONCURRENTLY; running workers wait at most one catalog change.
+    conn must be in AUTOCOMMIT mode. Safe to re-run, and concurrent runs
+    wait for each other. Returns the fingerprint and the number of DDL
+    statements run.
+    """
+    await conn.execute(text("SELECT pg_advisory_lock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
+    try:
+        # Give up rather than queue behind a long query, which would stall
+        # every query arriving after the DDL
+        await conn.execute(text(f"SET lock_timeout = '{MIGRATION_LOCK_TIMEOUT}'"))
+        columns, indexes = await _existing_schema(conn)
+        existing = [table for table in Base.metadata.sorted_tables if table.name in columns]
+
+        ddl = conn.dialect.ddl_compiler(conn.dialect, None)
+        add_columns = []
+        unfillable = []
+        for table in existing:
+            for column in table.columns:
+                if column.name in columns[table.name]:
+                    continue
+                if not column.nullable and column.server_default is None:
+                    unfillable.append(f"{table.name}.{column.name}")
+                    continue
+                add_columns.append(f"ALTER TABLE {table.name} ADD COLUMN {ddl.get_column_specification(column)}")
+        if unfillable:
+            # Existing rows have no value for these; the migration must not
+            # leave them nullable while the fingerprint says they match
+            raise RuntimeError(
+                f"Cannot add NOT NULL columns without a server default: {', '.join(unfillable)}"
+            )
+
+        # New tables, with their indexes
+        new_tables = [table for table in Base.metadata.sorted_tables if table.name not in columns]
+        applied = 0
+        if new_tables:
+            await conn.run_sync(Base.metadata.create_all, tables=new_tables)
+            applied += len(new_tables)
+
+        for statement in add_columns:
+            await conn.execute(text(statement))
+            applied += 1
+
+        for table in existing:
+            for index in sorted(table.indexes, key=lambda i: i.name):
+                valid = indexes.get(index.name)
+                if valid:
+                    continue
+                if valid is False:
+                    await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {index.name}"))
+                await conn.execute(text(_create_index(index, conn.dialect)))
+                applied += 1
+
+        for name in OBSOLETE_INDEXES:
+            if name in indexes:
+                await conn.execute(text(f"DROP INDEX CONCURRENTLY IF EXISTS {name}"))
+                applied += 1
+
+        fingerprint = schema_fingerprint()
+        await conn.execute(
+            insert(SchemaVersion)
+            .values(id=1, fingerprint=fingerprint)
+            .on_conflict_do_update(
+                index_elements=[SchemaVersion.id],
+                set_={"fingerprint": fingerprint, "applied_at": text("now()")}
+            )
+        )
+        return fingerprint, applied
+    finally:
+        await conn.execute(text("RESET lock_timeout"))
+        await conn.execute(text("SELECT pg_advisory_unlock(:lock_id)"), {"lock_id": MIGRATION_LOCK_ID})
@@ -1,5 +1,5 @@
 from app.database import Base
-from sqlalchemy import Column, Integer, String, Float, Text, DateTime, Boolean, ForeignKey
+from sqlalchemy import Column, Integer, BigInteger, String, Float, Text, Date, DateTime, Boolean, ForeignKey, UniqueConstraint, Index, LargeBinary
 from sqlalchemy.orm import relationship,Mapped, mapped_column
 from datetime import datetime
 from typing import Optional
@@ -52,10 +52,20 @@ class ActivityLog(Base):
 from sqlalchemy import Column, Integer, String, Text, Float, DateTime, ForeignKey
 from sqlalchemy.orm import relationship
 from sqlalchemy.sql import func
+from sqlalchemy import select, union_all
+from functools import lru_cache
 from datetime import datetime
 
 class Report(Base):
     __tablename__ = "reports"
+    __table_args__ = (
+        Index("ix_reports_location", "location_lat", "location_long"),
+        # Keyset pagination and delta sync walk these in (timestamp, id) order
+        Index("ix_reports_created_at_id", "created_at", "id"),
+        Index("ix_reports_updated_at_id", "updated_at", "id"),
+        Index("ix_reports_user_id_created_at_id", "user_id", "created_at", "id"),
+        Index("ix_reports_user_email_created_at_id", "user_email", "created_at", "id"),
+    )
     
     id = Column(Integer, primary_key=True, index=True)
     
@@ -83,6 +93,7 @@ class Report(Base):
     location_long = Column(Float, nullable=False)
     location_address = Column(Text, nullable=True)
     distance = Column(Float, nullable=True)
+    ward = Column(String(100), nullable=True, index=True)
     
     # Admin Assignment
     assigned_department = Column(String(100), nullable=True)
@@ -105,6 +116,103 @@ class Report(Base):
     department: Mapped[str] = mapped_column(String, default="other")
     auto_assigned: Mapped[bool] = mapped_column(Boolean, default=False)
     prediction_confidence: Mapped[Optional[float]] = mapped_column(Float, nullable=True)
+
+class ReportTombstone(Base):
+    __tablename__ = "report_tombstones"
+
+    # Remembers deleted reports so delta-sync clients can drop them
+    id = Column(Integer, primary_key=True, index=True)
+    report_id = Column(Integer, nullable=False, index=True)
+    deleted_at = Column(DateTime, server_default=func.now(), index=True)
+
+class ReportArchive(Base):
+    __tablename__ = "reports_archive"
+    __table_args__ = (
+        # Monthly partitions are created by the archival job as it needs them
+        {"postgresql_partition_by": "RANGE (created_at)"},
+    )
+
+    # Old resolved reports moved out of the reports table. The columns the
+    # rollups and counters are keyed on stay queryable; the full row is kept
+    # as zlib-compressed JSON.
+    id = Column(Integer, primary_key=True, autoincrement=False)
+    created_at = Column(DateTime, primary_key=True)
+    updated_at = Column(DateTime)
+    archived_at = Column(DateTime, server_default=func.now())
+    department = Column(String)
+    status = Column(String(20))
+    status_id = Column(Integer)
+    category_id = Column(Integer)
+    issue_type = Column(String(50))
+    auto_assigned = Column(Boolean)
+    prediction_confidence = Column(Float)
+    location_lat = Column(Float)
+    location_long = Column(Float)
+    ward = Column(String(100))
+    payload = Column(LargeBinary, nullable=False)
+
+@lru_cache(maxsize=None)
+def counted_reports():
+    """
+    The reports the dashboards count: live ones plus archived ones, whose
+    history stays in the statistics. One shared subquery, so filters can be
+    written against its columns.
+    """
+    columns = (
+        "id", "department", "status", "status_id", "category_id", "issue_type", "auto_assigned",
+        "prediction_confidence", "location_lat", "location_long", "ward", "created_at", "updated_at",
+    )
+    return union_all(
+        select(*(Report.__table__.c[name] for name in columns)),
+        select(*(ReportArchive.__table__.c[name] for name in columns)),
+    ).subquery("counted_reports")
+
+class GridCellRollup(Base):
+    __tablename__ = "grid_cell_rollups"
+    __table_args__ = (
+        UniqueConstraint("level", "cell_lat", "cell_long", "department", "status", name="uq_grid_cell_rollups_key"),
+    )
+
+    # Report counts per map grid cell, kept up to date on every report write
+    id = Column(Integer, primary_key=True, index=True)
+    level = Column(Integer, nullable=False)
+    cell_lat = Column(Integer, nullable=False)
+    cell_long = Column(Integer, nullable=False)
+    department = Column(String, nullable=False)
+    status = Column(String(20), nullable=False)
+    report_count = Column(Integer, nullable=False, default=0)
+
+class ReportCounter(Base):
+    __tablename__ = "report_counters"
+
+    # Named report counters for the dashboards. Each counter is spread over a
+    # few shard rows so concurrent writers rarely wait on the same row lock;
+    # the value is the sum over shards.
+    name = Column(String(150), primary_key=True)
+    shard = Column(Integer, primary_key=True, default=0)
+    value = Column(BigInteger, nullable=False, default=0)
+
+class ReportDailyRollup(Base):
+    __tablename__ = "report_daily_rollups"
+    __table_args__ = (
+        UniqueConstraint("department", "status", "day", name="uq_report_daily_rollups_key"),
+    )
+
+    # Reports created on a day, by department and current status
+    id = Column(Integer, primary_key=True, index=True)
+    department = Column(String, nullable=False)
+    status = Column(String(20), nullable=False)
+    day = Column(Date, nullable=False, index=True)
+    report_count = Column(Integer, nullable=False, default=0)
+    
+class SchemaVersion(Base):
+    __tablename__ = "schema_version"
+
+    # Single row written by "maintenance.py migrate": the fingerprint of the
+    # models the database was last migrated to
+    id = Column(Integer, primary_key=True, default=1)
+    fingerprint = Column(String(64), nullable=False)
+    applied_at = Column(DateTime, server_default=func.now(), onupdate=func.now())
     
 # ========== DEPARTMENT ANALYSIS MODELS ==========
 
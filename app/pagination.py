@@ -0,0 +1,84 @@
+import base64
+import json
+import os
+from datetime import datetime
+from typing import List, Optional, Sequence, Tuple
+
+from sqlalchemy import tuple_
+
+from app.models import Report
+
+DEFAULT_PAGE_SIZE = int(os.getenv("DEFAULT_PAGE_SIZE", "100"))
+MAX_PAGE_SIZE = int(os.getenv("MAX_PAGE_SIZE", "1000"))
+
+# Endpoints that return a bare list send the next page's cursor in this header
+NEXT_CURSOR_HEADER = "X-Next-Cursor"
+
+# Sort keys a page cursor can be taken on; each is backed by a (column, id) index
+SORT_COLUMNS = {
+    "created": Report.created_at,
+    "updated": Report.updated_at,
+}
+
+
+def encode_page_cursor(key: str, value: datetime, last_id: int, descending: bool) -> str:
+    """
+    Encodes the position after the last row of a page as an opaque cursor.
+    """
+    payload = json.dumps({"k": key, "d": descending, "v": value.isoformat(), "id": last_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_page_cursor(cursor: str, key: str, descending: bool) -> Tuple[datetime, int]:
+    """
+    Decodes a page cursor for the given ordering. Raises ValueError if it is
+    invalid or was issued for another ordering.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        position = datetime.fromisoformat(payload["v"]), int(payload["id"])
+        matches = payload["k"] == key and payload["d"] == descending
+    except Exception:
+        raise ValueError("Invalid page cursor")
+    if not matches:
+        raise ValueError("Page cursor belongs to a different listing")
+    return position
+
+
+def paginate(stmt, key: str, after: Optional[str], limit: int, descending: bool = True):
+    """
+    Orders stmt by (sort column, id) and continues after the cursor.
+    Fetches one extra row so split_page can tell whether more pages exist.
+    Rows without a sort timestamp have no position and are left out; every
+    write path sets both columns, so only hand-made rows lack them.
+    """
+    column = SORT_COLUMNS[key]
+    # Plain IS NOT NULL keeps the (column, id) index usable in both directions
+    stmt = stmt.where(column.isnot(None))
+    if after:
+        position = decode_page_cursor(after, key, descending)
+        if descending:
+            stmt = stmt.where(tuple_(column, Report.id) < position)
+        else:
+            stmt = stmt.where(tuple_(column, Report.id) > position)
+    if descending:
+        stmt = stmt.order_by(column.desc(), Report.id.desc())
+    else:
+        stmt = stmt.order_by(column.asc(), Report.id.asc())
+    return stmt.limit(limit + 1)
+
+
+def split_page(rows: Sequence, key: str, limit: int, descending: bool = True) -> Tuple[List, Optional[str]]:
+    """
+    Trims the extra row fetched by paginate. Returns the page and the cursor
+    of the next page, or None on the last page. Rows may be ORM objects or
+    result rows that include the sort column.
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    last = rows[-1]
+    value = getattr(last, SORT_COLUMNS[key].key)
+    return rows, encode_page_cursor(key, value, last.id, descending)
@@ -0,0 +1,73 @@
+from typing import Iterable, List
+
+from app.models import Report
+
+# Column sets for hot list endpoints. Selecting these returns plain rows, so
+# the large Text columns an endpoint does not emit are never transferred and
+# no ORM identity map or change tracking is involved.
+
+# Map markers with their popup details; updated_at feeds delta-sync cursors
+MAP_ISSUE_COLUMNS = (
+    Report.id,
+    Report.title,
+    Report.status,
+    Report.urgency_level,
+    Report.location_lat,
+    Report.location_long,
+    Report.description,
+    Report.user_email,
+    Report.location_address,
+    Report.created_at,
+    Report.updated_at,
+)
+
+# /api/admin/issues rows, which are emitted as-is
+ADMIN_ISSUE_COLUMNS = (
+    Report.id,
+    Report.user_name,
+    Report.user_email,
+    Report.user_mobile,
+    Report.title,
+    Report.description,
+    Report.category,
+    Report.urgency_level,
+    Report.status,
+    Report.location_address,
+    Report.ward,
+    Report.assigned_department,
+    Report.resolution_notes,
+    Report.images,
+    Report.created_at,
+    Report.updated_at,
+)
+
+RECENT_REPORT_COLUMNS = (
+    Report.id,
+    Report.title,
+    Report.description,
+    Report.location_address,
+    Report.status,
+    Report.department,
+    Report.created_at,
+)
+
+AUTO_ASSIGNED_COLUMNS = (
+    Report.id,
+    Report.description,
+    Report.department,
+    Report.prediction_confidence,
+    Report.status,
+    Report.category,
+    Report.created_at,
+)
+
+# Public dashboard feed: every report field, as the response has always
+# carried, but as plain rows rather than ORM entities
+DASHBOARD_RECENT_COLUMNS = tuple(Report.__table__.columns)
+
+
+def rows_as_dicts(rows: Iterable) -> List[dict]:
+    """
+    Maps projected rows to dicts keyed by column name.
+    """
+    return [row._asdict() for row in rows]
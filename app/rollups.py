@@ -0,0 +1,438 @@
+import math
+import os
+import re
+import random
+from collections import Counter
+from datetime import date
+from typing import Dict, Iterable, NamedTuple, Optional, Sequence, Tuple
+
+from sqlalchemy import BigInteger, Date, Integer, String, and_, any_, bindparam, cast, delete, event, func, literal, literal_column, or_, text
+from sqlalchemy.dialects.postgresql import ARRAY, insert
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+from sqlalchemy.orm import Session
+
+from app.models import Report, GridCellRollup, ReportDailyRollup, ReportCounter, counted_reports
+from app.cache import mark_changed
+from app.timebuckets import invalidate_bucket_cache
+
+# Heatmap resolutions as grid cells per degree (~11 km, ~1.1 km, ~110 m cells)
+GRID_LEVELS = {1: 10, 2: 100, 3: 1000}
+
+# Each writer adds to one random shard row of a counter so that concurrent
+# transactions do not queue on the lock of a single "total" row
+COUNTER_SHARDS = int(os.getenv("COUNTER_SHARDS", "8"))
+
+# Prediction confidences are summed in hundredths to keep the counter an integer
+CONFIDENCE_SCALE = 100
+
+# Write counter bumped by every transaction that changes reports; ETags are
+# derived from it. Version counters are not recounted by reconciliation.
+VERSION_PREFIX = "version:"
+REPORTS_VERSION = "version:reports"
+
+# session.info flag: the reports version was already bumped in this transaction
+VERSION_BUMPED_KEY = "reports_version_bumped"
+
+
+class ReportSnapshot(NamedTuple):
+    """The fields of a report that the rollup tables and counters are keyed on."""
+    department: str
+    status: str
+    location_lat: float
+    location_long: float
+    # None for a report that is not inserted yet; its day is the database's current_date
+    created_day: Optional[date] = None
+    status_id: Optional[int] = None
+    category_id: Optional[int] = None
+    issue_type: str = "General"
+    auto_assigned: bool = False
+    prediction_confidence: Optional[float] = None
+
+
+def snapshot_report(report: Report) -> ReportSnapshot:
+    """
+    Captures a report's rollup keys; take one before and one after a change.
+    """
+    return ReportSnapshot(
+        department=report.department or "other",
+        status=report.status or "Pending",
+        location_lat=report.location_lat,
+        location_long=report.location_long,
+        created_day=report.created_at.date() if report.created_at else None,
+        status_id=report.status_id,
+        category_id=report.category_id,
+        issue_type=report.issue_type or "General",
+        auto_assigned=bool(report.auto_assigned),
+        prediction_confidence=report.prediction_confidence,
+    )
+
+
+def grid_cell(lat: float, long: float, level: int) -> Tuple[int, int]:
+    """
+    Returns the integer cell coordinates of a point at a grid level.
+    """
+    scale = GRID_LEVELS[level]
+    return math.floor(lat * scale), math.floor(long * scale)
+
+
+def _grid_deltas(changes: Iterable[Tuple[Optional[ReportSnapshot], Optional[ReportSnapshot]]]) -> Counter:
+    deltas = Counter()
+    for before, after in changes:
+        if before == after:
+            continue
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is None or snapshot.location_lat is None or snapshot.location_long is None:
+                continue
+            for level in GRID_LEVELS:
+                cell_lat, cell_long = grid_cell(snapshot.location_lat, snapshot.location_long, level)
+                deltas[(level, cell_lat, cell_long, snapshot.department, snapshot.status)] += sign
+    return deltas
+
+
+def _daily_deltas(changes: Iterable[Tuple[Optional[ReportSnapshot], Optional[ReportSnapshot]]]) -> Counter:
+    deltas = Counter()
+    for before, after in changes:
+        if before == after:
+            continue
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is not None:
+                deltas[(snapshot.department, snapshot.status, snapshot.created_day)] += sign
+    return deltas
+
+
+def counter_values(snapshot: ReportSnapshot) -> Dict[str, int]:
+    """
+    Returns the counters one report contributes to, by counter name.
+    """
+    values = {
+        "total": 1,
+        f"status:{snapshot.status}": 1,
+        f"department:{snapshot.department}": 1,
+        f"issue_type:{snapshot.issue_type}": 1,
+    }
+    if snapshot.location_lat is not None and snapshot.location_long is not None:
+        values["located"] = 1
+        values[f"located:status:{snapshot.status}"] = 1
+    if snapshot.status_id is not None:
+        values[f"status_id:{snapshot.status_id}"] = 1
+    if snapshot.category_id is not None:
+        values[f"category_id:{snapshot.category_id}"] = 1
+    if snapshot.auto_assigned:
+        values["auto_assigned"] = 1
+        values[f"auto_assigned:department:{snapshot.department}"] = 1
+        if snapshot.prediction_confidence is not None:
+            values["auto_assigned:confidence_count"] = 1
+            values["auto_assigned:confidence_sum"] = round(snapshot.prediction_confidence * CONFIDENCE_SCALE)
+    return values
+
+
+def _counter_deltas(changes: Iterable[Tuple[Optional[ReportSnapshot], Optional[ReportSnapshot]]]) -> Counter:
+    deltas = Counter()
+    for before, after in changes:
+        if before == after:
+            continue
+        for snapshot, sign in ((before, -1), (after, 1)):
+            if snapshot is not None:
+                for name, value in counter_values(snapshot).items():
+                    deltas[name] += sign * value
+    return deltas
+
+
+def _counter_upsert(rows: list):
+    stmt = insert(ReportCounter).values(rows)
+    return stmt.on_conflict_do_update(
+        index_elements=["name", "shard"],
+        set_={"value": ReportCounter.value + stmt.excluded.value}
+    )
+
+
+async def _upsert_counts(db: AsyncSession, model, constraint: str, rows: list):
+    if not rows:
+        return
+    stmt = insert(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        constraint=constraint,
+        set_={"report_count": model.report_count + stmt.excluded.report_count}
+    )
+    await db.execute(stmt)
+
+
+async def apply_report_changes(
+    db: AsyncSession,
+    changes: Iterable[Tuple[Optional[ReportSnapshot], Optional[ReportSnapshot]]]
+):
+    """
+    Applies (before, after) report snapshots to the rollup tables in the
+    caller's transaction. Use None as before for a create and as after for a delete.
+    """
+    changes = list(changes)
+    if changes:
+        # Cached responses over reports are dropped once this transaction commits
+        mark_changed(db)
+
+    # Trend buckets count reports by created day: only creates and deletes
+    # change them, and only a closed bucket holding that day is cached.
+    # Reports stamped by the database now land in its open buckets.
+    changed_days = {
+        snapshot.created_day
+        for before, after in changes
+        if before is None or after is None or before.created_day != after.created_day
+        for snapshot in (before, after)
+        if snapshot is not None and snapshot.created_day is not None
+    }
+    if changed_days:
+        invalidate_bucket_cache(changed_days)
+
+    deltas = _grid_deltas(changes)
+    grid_rows = [
+        {
+            "level": level,
+            "cell_lat": cell_lat,
+            "cell_long": cell_long,
+            "department": department,
+            "status": status,
+            "report_count": delta,
+        }
+        # Sorted so concurrent writers lock rows in the same order
+        for (level, cell_lat, cell_long, department, status), delta in sorted(deltas.items())
+        if delta
+    ]
+    await _upsert_counts(db, GridCellRollup, "uq_grid_cell_rollups_key", grid_rows)
+
+    deltas = _daily_deltas(changes)
+    if any(day is None for _, _, day in deltas):
+        # Reports not inserted yet get the database's date, the same clock
+        # that fills their created_at
+        today = (await db.execute(select(func.current_date()))).scalar()
+        resolved = Counter()
+        for (department, status, day), delta in deltas.items():
+            resolved[(department, status, day or today)] += delta
+        deltas = resolved
+    daily_rows = [
+        {
+            "department": department,
+            "status": status,
+            "day": day,
+            "report_count": delta,
+        }
+        for (department, status, day), delta in sorted(deltas.items())
+        if delta
+    ]
+    await _upsert_counts(db, ReportDailyRollup, "uq_report_daily_rollups_key", daily_rows)
+
+    deltas = _counter_deltas(changes)
+    if changes and not db.sync_session.info.get(VERSION_BUMPED_KEY):
+        deltas[REPORTS_VERSION] += 1
+        db.sync_session.info[VERSION_BUMPED_KEY] = True
+    shard = random.randrange(COUNTER_SHARDS)
+    counter_rows = [
+        {"name": name, "shard": shard, "value": delta}
+        for name, delta in sorted(deltas.items())
+        if delta
+    ]
+    if counter_rows:
+        await db.execute(_counter_upsert(counter_rows))
+
+
+async def bump_reports_version(db: AsyncSession):
+    """
+    Bumps the reports version for writes made outside apply_report_changes
+    and the ORM, e.g. bulk UPDATE statements.
+    """
+    if not db.sync_session.info.get(VERSION_BUMPED_KEY):
+        await db.execute(_counter_upsert([{"name": REPORTS_VERSION, "shard": random.randrange(COUNTER_SHARDS), "value": 1}]))
+        db.sync_session.info[VERSION_BUMPED_KEY] = True
+
+
+@event.listens_for(Session, "after_flush")
+def _bump_version_on_report_flush(session, flush_context):
+    # Any ORM write to reports bumps the version once per transaction, so
+    # paths that only touch columns without rollups still change ETags
+    if session.info.get(VERSION_BUMPED_KEY):
+        return
+    for obj in list(session.new) + list(session.dirty) + list(session.deleted):
+        if isinstance(obj, Report):
+            session.execute(_counter_upsert([{"name": REPORTS_VERSION, "shard": random.randrange(COUNTER_SHARDS), "value": 1}]))
+            session.info[VERSION_BUMPED_KEY] = True
+            return
+
+
+@event.listens_for(Session, "after_commit")
+@event.listens_for(Session, "after_rollback")
+def _reset_version_flag(session):
+    session.info.pop(VERSION_BUMPED_KEY, None)
+
+
+# One statement for any mix of names and prefixes, so it is built and
+# compiled once; the ETag check on every polled request runs it
+READ_COUNTERS = (
+    select(ReportCounter.name, func.sum(ReportCounter.value))
+    .where(or_(
+        ReportCounter.name == any_(bindparam("names", type_=ARRAY(String))),
+        ReportCounter.name.like(any_(bindparam("patterns", type_=ARRAY(String)))),
+    ))
+    .group_by(ReportCounter.name)
+)
+
+_LIKE_ESCAPES = re.compile(r"[\\%_]")
+
+
+async def read_counters(
+    db: AsyncSession,
+    names: Sequence[str] = (),
+    prefixes: Sequence[str] = ()
+) -> Dict[str, int]:
+    """
+    Returns counter values by name for the given names and name prefixes.
+    Counters that were never written are missing from the result; read with .get(name, 0).
+    """
+    if not names and not prefixes:
+        return {}
+    patterns = [_LIKE_ESCAPES.sub(r"\\\g<0>", prefix) + "%" for prefix in prefixes]
+    result = await db.execute(READ_COUNTERS, {"names": list(names), "patterns": patterns})
+    return {name: int(value) for name, value in result.all()}
+
+
+async def compute_counters(db: AsyncSession) -> Counter:
+    """
+    Computes every counter from live and archived reports with one GROUP BY query.
+    """
+    reports = counted_reports()
+    department = func.coalesce(reports.c.department, literal_column("'other'"))
+    report_status = func.coalesce(reports.c.status, literal_column("'Pending'"))
+    issue_type = func.coalesce(reports.c.issue_type, literal_column("'General'"))
+    auto_assigned = func.coalesce(reports.c.auto_assigned, literal_column("false"))
+    located = and_(reports.c.location_lat.isnot(None), reports.c.location_long.isnot(None))
+    keys = [department, report_status, reports.c.status_id, reports.c.category_id, issue_type, auto_assigned, located]
+    confidence_sum = func.sum(cast(func.round(reports.c.prediction_confidence * literal_column(str(CONFIDENCE_SCALE))), BigInteger))
+
+    result = await db.execute(
+        select(*keys, func.count(reports.c.id), func.count(reports.c.prediction_confidence), confidence_sum)
+        .group_by(*keys)
+    )
+
+    counters = Counter()
+    for dept, report_status, status_id, category_id, issue_type, auto_assigned, located, count, confidence_count, confidence_total in result.all():
+        snapshot = ReportSnapshot(
+            department=dept,
+            status=report_status,
+            location_lat=0.0 if located else None,
+            location_long=0.0 if located else None,
+            status_id=status_id,
+            category_id=category_id,
+            issue_type=issue_type,
+            auto_assigned=auto_assigned,
+        )
+        for name, value in counter_values(snapshot).items():
+            counters[name] += value * count
+        if auto_assigned and confidence_count:
+            counters["auto_assigned:confidence_count"] += confidence_count
+            counters["auto_assigned:confidence_sum"] += int(confidence_total or 0)
+    return counters
+
+
+async def reconcile_counters(db: AsyncSession) -> Dict[str, Tuple[int, int]]:
+    """
+    Recounts the counters from live and archived reports and rewrites them.
+    Returns the counters that had drifted as {name: (stored, actual)}.
+    """
+    await db.execute(text("LOCK TABLE reports IN SHARE MODE"))
+    actual = await compute_counters(db)
+
+    recounted = ~ReportCounter.name.startswith(VERSION_PREFIX)
+    result = await db.execute(
+        select(ReportCounter.name, func.sum(ReportCounter.value)).where(recounted).group_by(ReportCounter.name)
+    )
+    stored = {name: int(value) for name, value in result.all()}
+
+    drift = {
+        name: (stored.get(name, 0), actual.get(name, 0))
+        for name in set(stored) | set(actual)
+        if stored.get(name, 0) != actual.get(name, 0)
+    }
+    if drift:
+        # Collapse the shards into one row per counter
+        await db.execute(delete(ReportCounter).where(recounted))
+        rows = [{"name": name, "shard": 0, "value": value} for name, value in sorted(actual.items()) if value]
+        if rows:
+            await db.execute(insert(ReportCounter).values(rows))
+    return drift
+
+
+async def rebuild_grid_rollups(db: AsyncSession) -> int:
+    """
+    Recomputes the grid rollups from live and archived reports. Returns the number of cells.
+    """
+    # Block report writes while recounting so no change is lost or counted twice
+    await db.execute(text("LOCK TABLE reports IN SHARE MODE"))
+    await db.execute(delete(GridCellRollup))
+
+    # Constants are inlined so the GROUP BY expressions match the select list
+    reports = counted_reports()
+    department = func.coalesce(reports.c.department, literal_column("'other'"))
+    status = func.coalesce(reports.c.status, literal_column("'Pending'"))
+    for level, scale in GRID_LEVELS.items():
+        cell_lat = cast(func.floor(reports.c.location_lat * literal_column(str(scale))), Integer)
+        cell_long = cast(func.floor(reports.c.location_long * literal_column(str(scale))), Integer)
+        await db.execute(
+            insert(GridCellRollup).from_select(
+                ["level", "cell_lat", "cell_long", "department", "status", "report_count"],
+                select(literal(level), cell_lat, cell_long, department, status, func.count(reports.c.id))
+                .where(reports.c.location_lat.isnot(None), reports.c.location_long.isnot(None))
+                .group_by(cell_lat, cell_long, department, status)
+            )
+        )
+
+    result = await db.execute(select(func.count(GridCellRollup.id)))
+    return result.scalar() or 0
+
+
+async def rebuild_daily_rollups(db: AsyncSession) -> int:
+    """
+    Recomputes the daily rollups from live and archived reports. Returns the number of rows.
+    """
+    await db.execute(text("LOCK TABLE reports IN SHARE MODE"))
+    await db.execute(delete(ReportDailyRollup))
+
+    reports = counted_reports()
+    department = func.coalesce(reports.c.department, literal_column("'other'"))
+    status = func.coalesce(reports.c.status, literal_column("'Pending'"))
+    day = cast(reports.c.created_at, Date)
+    await db.execute(
+        insert(ReportDailyRollup).from_select(
+            ["department", "status", "day", "report_count"],
+            select(department, status, day, func.count(reports.c.id))
+            .where(reports.c.created_at.isnot(None))
+            .group_by(department, status, day)
+        )
+    )
+
+    result = await db.execute(select(func.count(ReportDailyRollup.id)))
+    return result.scalar() or 0
+
+
+async def backfill_rollups(db: AsyncSession) -> Dict[str, int]:
+    """
+    Fills the counters and the grid and daily rollups when they hold nothing
+    while reports exist, as on an existing database whose rollup tables were
+    just created. Commits after each table. Returns the rows written per table.
+    """
+    reports = counted_reports()
+    if not (await db.execute(select(reports.c.id).limit(1))).first():
+        return {}
+
+    filled = {}
+    has_counters = (await db.execute(
+        select(ReportCounter.name).where(~ReportCounter.name.startswith(VERSION_PREFIX)).limit(1)
+    )).first()
+    if not has_counters:
+        filled[ReportCounter.__tablename__] = len(await reconcile_counters(db))
+        await db.commit()
+    if not (await db.execute(select(GridCellRollup.id).limit(1))).first():
+        filled[GridCellRollup.__tablename__] = await rebuild_grid_rollups(db)
+        await db.commit()
+    if not (await db.execute(select(ReportDailyRollup.id).limit(1))).first():
+        filled[ReportDailyRollup.__tablename__] = await rebuild_daily_rollups(db)
+        await db.commit()
+    return filled
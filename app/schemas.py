@@ -1,5 +1,6 @@
 from pydantic import BaseModel, EmailStr, validator
-from typing import Optional, List
+from typing import Dict, Optional, List
+import os
 import re
 from datetime import datetime
 from enum import Enum
@@ -150,6 +151,40 @@ class ReportCreate(BaseModel):
             raise ValueError('Longitude must be between -180 and 180')
         return v
 
+class ReportIngest(ReportCreate):
+    # Imported backlogs carry their original filing time and state
+    status: Optional[str] = "Pending"
+    created_at: Optional[datetime] = None
+
+    @validator('status')
+    def validate_status(cls, v):
+        valid_statuses = ["Pending", "In Progress", "Resolved"]
+        if v and v not in valid_statuses:
+            raise ValueError(f'Status must be one of: {", ".join(valid_statuses)}')
+        return v or "Pending"
+
+    @validator('department')
+    def validate_department(cls, v):
+        valid_depts = ["water_dept", "road_dept", "sanitation_dept", "electricity_dept", "other"]
+        if v and v not in valid_depts:
+            raise ValueError(f'Department must be one of: {", ".join(valid_depts)}')
+        return v or "other"
+
+class ReportIngestRequest(BaseModel):
+    # Rows are validated one by one so a bad row is reported, not fatal
+    reports: List[dict]
+    predict_departments: bool = False
+
+class ReportIngestRowError(BaseModel):
+    row: int  # 1-based, like the CLI
+    errors: List[str]
+
+class ReportIngestResponse(BaseModel):
+    message: str
+    inserted_count: int
+    report_ids: List[int]
+    errors: List[ReportIngestRowError]
+
 class ReportResponse(BaseModel):
     id: int
     user_name: str
@@ -164,6 +199,7 @@ class ReportResponse(BaseModel):
     location_long: float
     location_address: Optional[str]
     distance: Optional[float]
+    ward: Optional[str] = None
     images: Optional[str]
     voice_note: Optional[str]
     assigned_department: Optional[str]
@@ -172,6 +208,8 @@ class ReportResponse(BaseModel):
     created_at: datetime
     updated_at: datetime
     user_id: Optional[int]
+    # Served from the archive of old resolved reports
+    archived: bool = False
 
     class Config:
         from_attributes = True
@@ -231,6 +269,36 @@ class ResolveIssue(BaseModel):
     resolution_notes: str
     resolved_by: str
 
+# Upper bound on ids per bulk admin call
+BULK_MAX_IDS = int(os.getenv("BULK_MAX_IDS", "10000"))
+
+class BulkIssueIds(BaseModel):
+    issue_ids: List[int]
+
+    @validator('issue_ids')
+    def validate_issue_ids(cls, v):
+        if not v:
+            raise ValueError('At least one issue ID must be provided')
+        if len(v) > BULK_MAX_IDS:
+            raise ValueError(f'Cannot update more than {BULK_MAX_IDS} issues at once')
+        return v
+
+class BulkStatusUpdate(BulkIssueIds, StatusUpdate):
+    pass
+
+class BulkDepartmentAssign(BulkIssueIds, DepartmentAssign):
+    pass
+
+class BulkResolveIssues(BulkIssueIds, ResolveIssue):
+    pass
+
+class BulkIssueResponse(BaseModel):
+    message: str
+    requested_count: int
+    # Ids by outcome: "updated" or "deleted", "not_found", and for deletes
+    # "referenced" (kept because confirmations or activity logs point at it)
+    outcomes: Dict[str, List[int]]
+
 class AdminReportsResponse(BaseModel):
     reports: List[ReportResponse]
     total_count: int
@@ -432,6 +500,12 @@ class MapIssueResponse(BaseModel):
 
 class MapIssuesResponse(BaseModel):
     issues: List[MapIssueResponse]
+    deleted_ids: List[int] = []
+    cursor: Optional[str] = None
+    # Delta mode: more changes are pending; poll again with cursor right away
+    has_more: bool = False
+    # Full listing: cursor of the next page
+    next_cursor: Optional[str] = None
 
 
 class MapBoundsRequest(BaseModel):
@@ -469,4 +543,63 @@ class MapStatsResponse(BaseModel):
     total_issues: int
     pending_issues: int
     in_progress_issues: int
-    resolved_issues: int
\ No newline at end of file
+    resolved_issues: int
+
+
+class HeatmapCell(BaseModel):
+    lat: float
+    long: float
+    count: int
+
+
+class HeatmapResponse(BaseModel):
+    resolution: int
+    cell_size_deg: float
+    total_count: int
+    max_count: int
+    cells: List[HeatmapCell]
+
+
+class PolygonQueryRequest(BaseModel):
+    polygon: List[List[float]]  # [[lat, long], ...] outer boundary
+    holes: Optional[List[List[List[float]]]] = None
+    status: Optional[str] = None  # a status name, "open" or "all"
+    department: Optional[str] = None
+
+    @validator('polygon')
+    def validate_polygon(cls, v):
+        if len(v) < 3:
+            raise ValueError('Polygon must have at least 3 points')
+        for point in v:
+            if len(point) != 2 or not -90 <= point[0] <= 90 or not -180 <= point[1] <= 180:
+                raise ValueError('Polygon points must be [lat, long] pairs within valid ranges')
+        return v
+
+    @validator('holes')
+    def validate_holes(cls, v):
+        for hole in v or []:
+            if len(hole) < 3 or any(len(point) != 2 for point in hole):
+                raise ValueError('Each hole must have at least 3 [lat, long] points')
+        return v
+
+
+class RouteCorridorRequest(BaseModel):
+    path: List[List[float]]  # [[lat, long], ...] along the road
+    buffer_m: float = 50.0
+    status: Optional[str] = None  # a status name, "open" or "all"
+    department: Optional[str] = None
+
+    @validator('path')
+    def validate_path(cls, v):
+        if len(v) < 2:
+            raise ValueError('Path must have at least 2 points')
+        for point in v:
+            if len(point) != 2 or not -90 <= point[0] <= 90 or not -180 <= point[1] <= 180:
+                raise ValueError('Path points must be [lat, long] pairs within valid ranges')
+        return v
+
+    @validator('buffer_m')
+    def validate_buffer(cls, v):
+        if not 1 <= v <= 5000:
+            raise ValueError('Buffer must be between 1 and 5000 metres')
+        return v
@@ -0,0 +1,82 @@
+import asyncio
+import functools
+import json
+from typing import Awaitable, Callable, Dict
+
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.database import ReadSessionLocal
+
+metrics = {
+    "leaders": 0,
+    "followers": 0,
+}
+
+
+def request_key(func, kwargs: dict) -> str:
+    """
+    Identifies an endpoint call by function and parameters, ignoring the session.
+    """
+    params = {
+        name: value for name, value in kwargs.items()
+        if not isinstance(value, AsyncSession)
+    }
+    return f"{func.__module__}.{func.__qualname__}:{json.dumps(params, sort_keys=True, default=str)}"
+
+
+async def call_in_own_session(func, args, kwargs):
+    """
+    Calls an endpoint with any AsyncSession argument replaced by a fresh
+    session, so the call does not depend on one request's lifetime.
+    """
+    async with ReadSessionLocal() as session:
+        kwargs = {
+            name: session if isinstance(value, AsyncSession) else value
+            for name, value in kwargs.items()
+        }
+        return await func(*args, **kwargs)
+
+
+class SingleFlight:
+    """
+    Runs at most one computation per key at a time; callers arriving while it
+    is in flight await the same result (or exception) instead of starting another.
+    """
+
+    def __init__(self):
+        self.in_flight: Dict[str, asyncio.Task] = {}
+
+    async def do(self, key: str, compute: Callable[[], Awaitable]):
+        task = self.in_flight.get(key)
+        if task is None:
+            metrics["leaders"] += 1
+            task = asyncio.ensure_future(compute())
+            self.in_flight[key] = task
+            task.add_done_callback(functools.partial(self._finished, key))
+        else:
+            metrics["followers"] += 1
+        # Shielded so one caller going away does not cancel the others' result
+        return await asyncio.shield(task)
+
+    def _finished(self, key: str, task: asyncio.Task):
+        if self.in_flight.get(key) is task:
+            del self.in_flight[key]
+        if not task.cancelled():
+            # Mark the exception retrieved in case every caller went away
+            task.exception()
+
+
+flight = SingleFlight()
+
+
+def coalesced(func):
+    """
+    Makes concurrent identical calls of an endpoint share one execution.
+    The shared call runs on its own session, since any of the waiting
+    requests may finish first.
+    """
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        return await flight.do(request_key(func, kwargs), lambda: call_in_own_session(func, args, kwargs))
+
+    return wrapper
@@ -0,0 +1,201 @@
+import asyncio
+import functools
+import inspect
+import json
+import mmap
+import os
+import struct
+import tempfile
+import time
+from typing import Callable, Dict, Optional
+
+from fastapi.encoders import jsonable_encoder
+
+from app.database import ReadSessionLocal
+
+try:
+    import fcntl
+except ImportError:  # no flock outside POSIX; every worker computes its own stats
+    fcntl = None
+
+SNAPSHOT_ENABLED = os.getenv("SNAPSHOT_ENABLED", "true").lower() not in ("0", "false", "no") and fcntl is not None
+SNAPSHOT_PATH = os.getenv("SNAPSHOT_PATH", os.path.join(tempfile.gettempdir(), "urban_public_stats.snapshot"))
+SNAPSHOT_INTERVAL = float(os.getenv("SNAPSHOT_INTERVAL_SECONDS", "5"))
+# Readers ignore a snapshot older than this, e.g. when the writer has died
+SNAPSHOT_MAX_AGE = float(os.getenv("SNAPSHOT_MAX_AGE_SECONDS", str(SNAPSHOT_INTERVAL * 3)))
+SNAPSHOT_MAX_BYTES = int(os.getenv("SNAPSHOT_MAX_BYTES", str(1024 * 1024)))
+
+# magic, version, written_at, payload length; the payload follows the header.
+# The version is odd while the writer is mid-update (a seqlock), so readers
+# can detect and retry a torn read without any cross-process lock.
+SNAPSHOT_MAGIC = b"URBSNAP1"
+HEADER = struct.Struct("<8sQdI")
+HEADER_SIZE = 32
+
+# Snapshot section name -> endpoint function that computes it
+SECTIONS: Dict[str, Callable] = {}
+
+
+class SnapshotReader:
+    """
+    Reads the shared snapshot through a read-only memory map. The payload is
+    parsed once per version; other reads only look at the header.
+    """
+
+    def __init__(self, path: str):
+        self.path = path
+        self.map: Optional[mmap.mmap] = None
+        self.version = None
+        self.written_at = 0.0
+        self.data: Optional[dict] = None
+
+    def _open(self) -> bool:
+        if self.map is not None:
+            return True
+        try:
+            with open(self.path, "rb") as f:
+                if os.fstat(f.fileno()).st_size < HEADER_SIZE:
+                    return False
+                self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            return True
+        except (FileNotFoundError, ValueError):
+            return False
+
+    def read(self) -> Optional[dict]:
+        """
+        Returns the latest snapshot, or None if there is no fresh one.
+        """
+        if not self._open():
+            return None
+        for _ in range(3):
+            magic, version, written_at, length = HEADER.unpack_from(self.map, 0)
+            if magic != SNAPSHOT_MAGIC:
+                return None
+            if version % 2:
+                continue
+            if version != self.version:
+                if HEADER_SIZE + length > len(self.map):
+                    # The writer grew the file; map it again
+                    self._close()
+                    if not self._open():
+                        return None
+                    continue
+                payload = self.map[HEADER_SIZE:HEADER_SIZE + length]
+                if HEADER.unpack_from(self.map, 0)[1] != version:
+                    continue
+                self.data = json.loads(payload)
+                self.version = version
+                self.written_at = written_at
+            break
+        if self.data is None or time.time() - self.written_at > SNAPSHOT_MAX_AGE:
+            # Remap next time in case a new writer recreated the file
+            self._close()
+            return None
+        return self.data
+
+    def _close(self):
+        if self.map is not None:
+            self.map.close()
+        self.map = None
+        self.version = None
+        self.data = None
+
+
+class SnapshotWriter:
+    """
+    Writes snapshots into a fixed-size memory-mapped file in place.
+    """
+
+    def __init__(self, path: str, max_bytes: int):
+        size = HEADER_SIZE + max_bytes
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            # Only ever grow the file: shrinking it under a reader's map would fault
+            if os.fstat(fd).st_size < size:
+                os.ftruncate(fd, size)
+            self.map = mmap.mmap(fd, 0, access=mmap.ACCESS_WRITE)
+        finally:
+            os.close(fd)
+        magic, version, _, _ = HEADER.unpack_from(self.map, 0)
+        # Continue from the existing version so readers never see it go back
+        self.version = version + (version % 2) if magic == SNAPSHOT_MAGIC else 0
+
+    def write(self, data: dict) -> bool:
+        payload = json.dumps(data, separators=(",", ":")).encode()
+        if HEADER_SIZE + len(payload) > len(self.map):
+            print(f"⚠️ Snapshot of {len(payload)} bytes exceeds SNAPSHOT_MAX_BYTES; not published")
+            return False
+        self.version += 1
+        HEADER.pack_into(self.map, 0, SNAPSHOT_MAGIC, self.version, time.time(), 0)
+        self.map[HEADER_SIZE:HEADER_SIZE + len(payload)] = payload
+        self.version += 1
+        HEADER.pack_into(self.map, 0, SNAPSHOT_MAGIC, self.version, time.time(), len(payload))
+        return True
+
+
+reader = SnapshotReader(SNAPSHOT_PATH)
+
+
+def from_snapshot(section: str):
+    """
+    Serves an endpoint from the shared snapshot when a fresh one exists and
+    registers it as a section for the writer. Without a snapshot the
+    endpoint runs as usual.
+    """
+    def decorator(func):
+        SECTIONS[section] = func
+
+        @functools.wraps(func)
+        async def wrapper(*args, **kwargs):
+            if SNAPSHOT_ENABLED:
+                data = reader.read()
+                if data is not None and section in data:
+                    return data[section]
+            return await func(*args, **kwargs)
+
+        return wrapper
+
+    return decorator
+
+
+async def build_snapshot() -> dict:
+    """
+    Computes every registered section, bypassing response caches.
+    """
+    data = {}
+    async with ReadSessionLocal() as session:
+        for section, func in SECTIONS.items():
+            try:
+                data[section] = jsonable_encoder(await inspect.unwrap(func)(db=session))
+            except Exception as e:
+                # Readers fall back to computing a missing section themselves
+                print(f"❌ Snapshot section {section} failed: {e}")
+                await session.rollback()
+    return data
+
+
+def _try_lock(lock_file) -> bool:
+    try:
+        fcntl.flock(lock_file.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        return True
+    except BlockingIOError:
+        return False
+
+
+async def run_snapshot_writer():
+    """
+    Every worker runs this; the one holding the lock file writes snapshots and
+    the others keep retrying so one takes over if the writer dies.
+    """
+    lock_file = open(SNAPSHOT_PATH + ".lock", "w")
+    while not _try_lock(lock_file):
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
+
+    print(f"✅ Elected public stats snapshot writer (pid {os.getpid()})")
+    writer = SnapshotWriter(SNAPSHOT_PATH, SNAPSHOT_MAX_BYTES)
+    while True:
+        try:
+            writer.write(await build_snapshot())
+        except Exception as e:
+            print(f"❌ Snapshot refresh failed: {e}")
+        await asyncio.sleep(SNAPSHOT_INTERVAL)
@@ -0,0 +1,118 @@
+import base64
+import json
+import os
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional, Tuple
+
+from sqlalchemy import and_, func, text, tuple_
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import Report, ReportTombstone
+
+# updated_at/deleted_at are stamped with the writer's transaction start, so a
+# transaction still in progress can commit rows older than "now". Cursors never
+# move past the start of the oldest open transaction; the window is only a
+# margin for transactions that have begun but are not yet in pg_stat_activity.
+SYNC_SAFETY_WINDOW = timedelta(seconds=int(os.getenv("SYNC_SAFETY_WINDOW_SECONDS", "1")))
+
+# Writers connect as the API's own role, so their xact_start is visible here
+# without pg_read_all_stats.
+OLDEST_OPEN_TRANSACTION_SQL = text(
+    "SELECT min(xact_start)::timestamp FROM pg_stat_activity "
+    "WHERE datname = current_database() AND pid <> pg_backend_pid() "
+    "AND backend_type = 'client backend' AND xact_start IS NOT NULL"
+)
+
+
+def encode_sync_cursor(timestamp: datetime, last_id: int = 0) -> str:
+    """
+    Encodes an (updated_at, id) position as an opaque cursor string.
+    """
+    payload = json.dumps({"ts": timestamp.isoformat(), "id": last_id})
+    return base64.urlsafe_b64encode(payload.encode()).decode().rstrip("=")
+
+
+def decode_sync_cursor(cursor: str) -> Tuple[datetime, int]:
+    """
+    Decodes a cursor produced by encode_sync_cursor. Raises ValueError if invalid.
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        payload = json.loads(base64.urlsafe_b64decode(padded.encode()).decode())
+        return datetime.fromisoformat(payload["ts"]), int(payload.get("id", 0))
+    except Exception:
+        raise ValueError("Invalid sync cursor")
+
+
+async def get_sync_upper_bound(db: AsyncSession) -> datetime:
+    """
+    Returns the newest updated_at a delta may include: the database clock, held
+    back to just before the oldest transaction that may still commit changes.
+    """
+    now = (await db.execute(select(func.localtimestamp()))).scalar()
+    oldest = (await db.execute(OLDEST_OPEN_TRANSACTION_SQL)).scalar()
+    upper = now if oldest is None else min(now, oldest)
+    return upper - SYNC_SAFETY_WINDOW
+
+
+def changed_since(since: Tuple[datetime, int], upper: datetime):
+    """
+    WHERE clause for reports changed after the cursor and up to the upper bound.
+    """
+    # Row comparison so the (updated_at, id) index can serve the range
+    return and_(
+        tuple_(Report.updated_at, Report.id) > since,
+        Report.updated_at <= upper
+    )
+
+
+def sync_page(stmt, since: Tuple[datetime, int], upper: datetime, limit: int):
+    """
+    Restricts stmt to changes after the cursor in (updated_at, id) order,
+    fetching one extra row so split_sync_page can tell whether more remain.
+    """
+    return (
+        stmt.where(changed_since(since, upper))
+        .order_by(Report.updated_at, Report.id)
+        .limit(limit + 1)
+    )
+
+
+def split_sync_page(rows: List, limit: int) -> Tuple[List, Optional[Tuple[datetime, int]]]:
+    """
+    Trims the extra row fetched by sync_page. Returns the page and, when more
+    changes remain, the (updated_at, id) of its last row to continue from.
+    """
+    rows = list(rows)
+    if len(rows) <= limit:
+        return rows, None
+    rows = rows[:limit]
+    return rows, (rows[-1].updated_at, rows[-1].id)
+
+
+async def get_deleted_ids(db: AsyncSession, since: Tuple[datetime, int], upper: datetime) -> List[int]:
+    """
+    Returns ids of reports deleted after the cursor and up to the upper bound.
+    """
+    result = await db.execute(
+        select(ReportTombstone.report_id)
+        .where(ReportTombstone.deleted_at > since[0])
+        .where(ReportTombstone.deleted_at <= upper)
+    )
+    return list(result.scalars().all())
+
+
+def parse_since(since: Optional[str]) -> Optional[Tuple[datetime, int]]:
+    """
+    Parses the ``since`` query parameter; accepts a cursor or an ISO timestamp.
+    """
+    if not since:
+        return None
+    try:
+        return decode_sync_cursor(since)
+    except ValueError:
+        timestamp = datetime.fromisoformat(since)
+        if timestamp.tzinfo is not None:
+            timestamp = timestamp.astimezone(timezone.utc).replace(tzinfo=None)
+        return timestamp, 0
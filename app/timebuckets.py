@@ -0,0 +1,171 @@
+import os
+import time
+from datetime import date, datetime, timedelta
+from typing import Dict, Iterable, List, Optional, Sequence, Tuple, Union
+
+from sqlalchemy import Date, cast, func, literal_column, true
+from sqlalchemy.ext.asyncio import AsyncSession
+from sqlalchemy.future import select
+
+from app.models import counted_reports
+
+BUCKET_UNITS = ("day", "week", "month", "year")
+
+# Dashboard "period" values and the bucket each trend point covers
+PERIOD_UNITS = {"week": "week", "month": "month", "year": "year"}
+
+# Closed buckets no longer change, so their counts are kept per process for
+# this long. Deletes clear the cache; the TTL bounds staleness across workers.
+BUCKET_CACHE_TTL = int(os.getenv("BUCKET_CACHE_TTL_SECONDS", "3600"))
+
+# (series, unit, bucket start) -> (expires at, count)
+_closed_bucket_cache: Dict[Tuple[str, str, date], Tuple[float, int]] = {}
+
+
+def truncate(value: Union[date, datetime], unit: str) -> date:
+    """
+    Returns the first day of the calendar bucket containing value.
+    Weeks start on Monday, matching PostgreSQL date_trunc('week', ...).
+    """
+    day = value.date() if isinstance(value, datetime) else value
+    if unit == "day":
+        return day
+    if unit == "week":
+        return day - timedelta(days=day.weekday())
+    if unit == "month":
+        return day.replace(day=1)
+    if unit == "year":
+        return day.replace(month=1, day=1)
+    raise ValueError(f"Bucket unit must be one of: {', '.join(BUCKET_UNITS)}")
+
+
+def shift(start: date, unit: str, count: int) -> date:
+    """
+    Moves a bucket start by count buckets (negative moves back in time).
+    """
+    if unit == "day":
+        return start + timedelta(days=count)
+    if unit == "week":
+        return start + timedelta(weeks=count)
+    if unit == "month":
+        months = start.year * 12 + (start.month - 1) + count
+        return date(months // 12, months % 12 + 1, 1)
+    if unit == "year":
+        return date(start.year + count, 1, 1)
+    raise ValueError(f"Bucket unit must be one of: {', '.join(BUCKET_UNITS)}")
+
+
+def bucket_starts(unit: str, count: int, today: Optional[date] = None) -> List[date]:
+    """
+    Returns the starts of the last count buckets, oldest first.
+    The last bucket is the current, still open one. Pass the database's
+    current bucket as today where it decides what is open, as the counts
+    are bucketed on the database clock.
+    """
+    current = truncate(today or date.today(), unit)
+    return [shift(current, unit, offset) for offset in range(-(count - 1), 1)]
+
+
+def bucket_label(start: date, unit: str) -> str:
+    """
+    Short chart label for a bucket: "Mon 12" for days, "12 Oct" for weeks,
+    "Oct" for months and "2025" for years.
+    """
+    if unit == "day":
+        return start.strftime("%a %d")
+    if unit == "week":
+        return start.strftime("%d %b")
+    if unit == "month":
+        return start.strftime("%b")
+    return str(start.year)
+
+
+def current_bucket(unit: str):
+    """
+    SQL for the start of the database's current bucket.
+    """
+    return cast(func.date_trunc(literal_column(f"'{unit}'"), func.current_date()), Date)
+
+
+def with_current_bucket(stmt, unit: str):
+    """
+    Prefixes every row of stmt with the database's current bucket start, so
+    "now" comes from the same clock as the bucketing. Yields one row of
+    Nones after it when stmt has no rows.
+    """
+    current = select(current_bucket(unit).label("current_bucket")).subquery("current")
+    rows = stmt.subquery("bucketed")
+    return select(current.c.current_bucket, *rows.c).select_from(current.outerjoin(rows, true()))
+
+
+def invalidate_bucket_cache(days: Optional[Iterable[date]] = None):
+    """
+    Drops the cached closed-bucket counts whose bucket contains one of days,
+    or every entry without days. Days in the database's open buckets match
+    nothing, as open buckets are never cached.
+    """
+    if days is None:
+        _closed_bucket_cache.clear()
+        return
+    days = set(days)
+    stale = [
+        key for key in _closed_bucket_cache
+        if any(truncate(day, key[1]) == key[2] for day in days)
+    ]
+    for key in stale:
+        del _closed_bucket_cache[key]
+
+
+async def count_by_bucket(
+    db: AsyncSession,
+    unit: str,
+    count: int,
+    column: str = "created_at",
+    filters: Sequence = (),
+    series: Optional[str] = None,
+    today: Optional[date] = None
+) -> List[Tuple[date, int]]:
+    """
+    Counts live and archived reports per calendar bucket of the named column
+    for the last count buckets in one grouped query. Filters are written
+    against counted_reports() columns. Returns (bucket start, count) oldest
+    first, with empty buckets as 0. With a series name, closed buckets are
+    served from the cache and only the remaining range is queried; the name
+    must identify the filters. The open bucket is the database's current
+    one; today is only a first guess.
+    """
+    if unit not in BUCKET_UNITS:
+        raise ValueError(f"Bucket unit must be one of: {', '.join(BUCKET_UNITS)}")
+
+    starts = bucket_starts(unit, count, today)
+    now = time.monotonic()
+    counts = {}
+    if series is not None:
+        # The last bucket is still open and is always counted
+        for start in starts[:-1]:
+            entry = _closed_bucket_cache.get((series, unit, start))
+            if entry and entry[0] > now:
+                counts[start] = entry[1]
+
+    missing = [start for start in starts if start not in counts]
+    first = missing[0]
+    source = counted_reports().c[column]
+    period = cast(func.date_trunc(literal_column(f"'{unit}'"), source), Date)
+    result = await db.execute(with_current_bucket(
+        select(period.label("period"), func.count().label("report_count"))
+        .where(source >= datetime(first.year, first.month, first.day), *filters)
+        .group_by(period),
+        unit
+    ))
+    rows = result.all()
+    if rows[0].current_bucket != starts[-1]:
+        # The app server's date is in another bucket than the database's;
+        # count again on the database's, so no open bucket gets cached
+        return await count_by_bucket(db, unit, count, column, filters, series, today=rows[0].current_bucket)
+    found = {row.period: row.report_count for row in rows if row.period is not None}
+
+    for start in missing:
+        counts[start] = found.get(start, 0)
+        if series is not None and start != starts[-1]:
+            _closed_bucket_cache[(series, unit, start)] = (now + BUCKET_CACHE_TTL, counts[start])
+    return [(start, counts[start]) for start in starts]
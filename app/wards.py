@@ -0,0 +1,69 @@
+import json
+import os
+from typing import List, Optional
+
+from app.geo import STRTree, point_in_rings, rings_bounds
+
+WARD_BOUNDARIES_PATH = os.getenv("WARD_BOUNDARIES_PATH", "ward_boundaries.geojson")
+WARD_NAME_PROPERTY = os.getenv("WARD_NAME_PROPERTY", "name")
+
+
+class WardIndex:
+    """
+    Point-in-polygon lookup of ward names over GeoJSON boundaries.
+    An R-tree over polygon bounds narrows each lookup to a few candidates.
+    """
+
+    def __init__(self, features: List[dict]):
+        items = []
+        names = set()
+        for feature in features:
+            name = (feature.get("properties") or {}).get(WARD_NAME_PROPERTY)
+            geometry = feature.get("geometry") or {}
+            if not name or geometry.get("type") not in ("Polygon", "MultiPolygon"):
+                continue
+            polygons = geometry["coordinates"]
+            if geometry["type"] == "Polygon":
+                polygons = [polygons]
+            for polygon in polygons:
+                # GeoJSON positions are [long, lat]
+                rings = [[(point[1], point[0]) for point in ring] for ring in polygon]
+                items.append((rings_bounds(rings[:1]), (str(name), rings)))
+            names.add(str(name))
+        self.names = sorted(names)
+        self.tree = STRTree(items)
+
+    @classmethod
+    def from_file(cls, path: str) -> "WardIndex":
+        if not os.path.exists(path):
+            print(f"⚠️ Ward boundaries file not found at {path}; ward lookup disabled")
+            return cls([])
+        with open(path) as f:
+            data = json.load(f)
+        index = cls(data.get("features", []))
+        print(f"✅ Loaded {len(index.names)} wards from {path}")
+        return index
+
+    def lookup(self, lat: float, long: float) -> Optional[str]:
+        """
+        Returns the ward containing the point, or None.
+        """
+        if lat is None or long is None:
+            return None
+        for name, rings in self.tree.query_point(lat, long):
+            if point_in_rings(lat, long, rings):
+                return name
+        return None
+
+
+_ward_index: Optional[WardIndex] = None
+
+
+def get_ward_index() -> WardIndex:
+    """
+    Returns the process-wide ward index, loading the boundaries file on first use.
+    """
+    global _ward_index
+    if _ward_index is None:
+        _ward_index = WardIndex.from_file(WARD_BOUNDARIES_PATH)
+    return _ward_index
@@ -0,0 +1,165 @@
+import asyncio
+import os
+from typing import List, Optional, Tuple
+
+from sqlalchemy import insert, text
+from sqlalchemy.exc import DBAPIError, DataError, IntegrityError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.bulk import SNAPSHOT_COLUMNS, snapshot_row
+from app.database import AsyncSessionLocal
+from app.models import Report
+from app.rollups import apply_report_changes
+
+# Off by default: each report is then inserted in the request's own transaction
+WRITE_BUFFER_ENABLED = os.getenv("WRITE_BUFFER_ENABLED", "false").lower() == "true"
+# Longest a report waits for others to share its insert and commit
+WRITE_BUFFER_MAX_DELAY_MS = float(os.getenv("WRITE_BUFFER_MAX_DELAY_MS", "5"))
+# A buffer this full is flushed without waiting for the delay
+WRITE_BUFFER_MAX_BATCH = int(os.getenv("WRITE_BUFFER_MAX_BATCH", "200"))
+# synchronous_commit for report inserts: "on" waits for the WAL flush; "off"
+# acknowledges sooner but can lose the last few hundred ms of reports on a crash
+WRITE_BUFFER_SYNCHRONOUS_COMMIT = os.getenv("WRITE_BUFFER_SYNCHRONOUS_COMMIT", "on")
+
+SYNCHRONOUS_COMMIT_LEVELS = {"on", "off", "local", "remote_write", "remote_apply"}
+if WRITE_BUFFER_SYNCHRONOUS_COMMIT not in SYNCHRONOUS_COMMIT_LEVELS:
+    raise ValueError(f"WRITE_BUFFER_SYNCHRONOUS_COMMIT must be one of: {', '.join(sorted(SYNCHRONOUS_COMMIT_LEVELS))}")
+
+# SQLSTATE classes of errors caused by the rows themselves: data exceptions
+# and integrity constraint violations. asyncpg only maps the latter to
+# IntegrityError, so the class is read from the error code.
+ROW_ERROR_SQLSTATE_CLASSES = ("22", "23")
+
+# Returned for every inserted report instead of re-selecting it
+RETURNING_COLUMNS = (
+    Report.__table__.c.id,
+    Report.__table__.c.ward,
+    *SNAPSHOT_COLUMNS,
+)
+
+
+async def insert_report_rows(db: AsyncSession, rows: List[dict]) -> List:
+    """
+    Inserts reports with INSERT ... RETURNING in the caller's transaction and
+    applies their rollups. Returns one row per input, in input order.
+    """
+    if WRITE_BUFFER_SYNCHRONOUS_COMMIT != "on":
+        await db.execute(text(f"SET LOCAL synchronous_commit = {WRITE_BUFFER_SYNCHRONOUS_COMMIT}"))
+    result = await db.execute(
+        insert(Report.__table__).returning(*RETURNING_COLUMNS, sort_by_parameter_order=True),
+        rows
+    )
+    inserted = result.all()
+    await apply_report_changes(db, [(None, snapshot_row(row)) for row in inserted])
+    return inserted
+
+
+def is_row_error(error: Exception) -> bool:
+    """
+    Whether a failed insert was rejected for its data, as opposed to the
+    connection or the server failing.
+    """
+    if isinstance(error, (IntegrityError, DataError)):
+        return True
+    if not isinstance(error, DBAPIError):
+        return False
+    sqlstate = getattr(error.orig, "sqlstate", None) or getattr(error.orig, "pgcode", None) or ""
+    return sqlstate[:2] in ROW_ERROR_SQLSTATE_CLASSES
+
+
+class ReportWriteBuffer:
+    """
+    Group commit for report creation: inserts arriving within max_delay of
+    each other share one multi-row INSERT and one commit. Each caller gets
+    its own row back, or its own error.
+    """
+
+    def __init__(self, max_delay: float, max_batch: int):
+        self.max_delay = max_delay
+        self.max_batch = max_batch
+        self._pending: List[Tuple[dict, asyncio.Future]] = []
+        self._timer: Optional[asyncio.TimerHandle] = None
+        self._flushes = set()
+        self.metrics = {"batches": 0, "reports": 0, "fallbacks": 0}
+
+    async def insert(self, row: dict):
+        """
+        Queues a report and waits until its batch is committed.
+        """
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((row, future))
+        if len(self._pending) >= self.max_batch:
+            self._flush_pending()
+        elif self._timer is None:
+            self._timer = loop.call_later(self.max_delay, self._flush_pending)
+        # A cancelled caller does not pull its report out of a batch in flight
+        return await asyncio.shield(future)
+
+    def _flush_pending(self):
+        if self._timer is not None:
+            self._timer.cancel()
+            self._timer = None
+        batch, self._pending = self._pending, []
+        if batch:
+            task = asyncio.create_task(self._flush(batch))
+            self._flushes.add(task)
+            task.add_done_callback(self._flushes.discard)
+
+    async def _flush(self, batch: List[Tuple[dict, asyncio.Future]]):
+        try:
+            async with AsyncSessionLocal() as session:
+                try:
+                    inserted = await insert_report_rows(session, [row for row, _ in batch])
+                except DBAPIError as e:
+                    if len(batch) == 1 or not is_row_error(e):
+                        raise
+                    # One bad row failed the statement before anything was
+                    # committed; retry each report on its own below so only
+                    # that caller sees the error
+                    inserted = None
+                else:
+                    await session.commit()
+        except Exception as e:
+            # Anything else, including errors raised by the commit itself: the
+            # batch may already be committed, so retrying could insert it twice
+            for _, future in batch:
+                if not future.done():
+                    future.set_exception(e)
+            return
+
+        if inserted is None:
+            self.metrics["fallbacks"] += 1
+            for row, future in batch:
+                await self._insert_alone(row, future)
+            return
+        self.metrics["batches"] += 1
+        self.metrics["reports"] += len(batch)
+        for (_, future), result in zip(batch, inserted):
+            if not future.done():
+                future.set_result(result)
+
+    async def _insert_alone(self, row: dict, future: asyncio.Future):
+        try:
+            async with AsyncSessionLocal() as session:
+                inserted = await insert_report_rows(session, [row])
+                await session.commit()
+        except Exception as e:
+            if not future.done():
+                future.set_exception(e)
+            return
+        self.metrics["batches"] += 1
+        self.metrics["reports"] += 1
+        if not future.done():
+            future.set_result(inserted[0])
+
+    async def drain(self):
+        """
+        Flushes queued reports and waits for batches in flight, e.g. on shutdown.
+        """
+        self._flush_pending()
+        if self._flushes:
+            await asyncio.gather(*self._flushes, return_exceptions=True)
+
+
+report_write_buffer = ReportWriteBuffer(WRITE_BUFFER_MAX_DELAY_MS / 1000, WRITE_BUFFER_MAX_BATCH)
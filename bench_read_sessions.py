@@ -0,0 +1,92 @@
+# bench_read_sessions.py
+# Compares request-shaped reads on the read-write session (get_db) with the
+# autocommit read session (get_read_db). Run against a populated database:
+#   DB_ECHO=false python bench_read_sessions.py --requests 2000 --concurrency 20
+import argparse
+import asyncio
+import os
+import statistics
+import time
+
+os.environ.setdefault("DB_ECHO", "false")
+
+from dotenv import load_dotenv
+from sqlalchemy import func
+from sqlalchemy.future import select
+
+from app.database import AsyncSessionLocal, ReadSessionLocal, engine, read_engine
+from app.models import Category, Report, Status
+
+
+async def categories(session):
+    result = await session.execute(select(Category.name))
+    return result.scalars().all()
+
+
+async def statuses(session):
+    result = await session.execute(select(Status))
+    return result.scalars().all()
+
+
+async def status_counts(session):
+    result = await session.execute(select(Report.status, func.count()).group_by(Report.status))
+    return result.all()
+
+
+QUERIES = {
+    "/categories": categories,
+    "/statuses (ORM entities)": statuses,
+    "status counts": status_counts,
+}
+
+
+async def one_request(session_factory, query) -> float:
+    # Mirrors a request: open a session, read, close
+    started = time.perf_counter()
+    async with session_factory() as session:
+        await query(session)
+    return (time.perf_counter() - started) * 1000
+
+
+async def run(session_factory, query, requests: int, concurrency: int):
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited():
+        async with semaphore:
+            return await one_request(session_factory, query)
+
+    # Warm the pool and the statement caches
+    await asyncio.gather(*(limited() for _ in range(concurrency)))
+    started = time.perf_counter()
+    latencies = await asyncio.gather(*(limited() for _ in range(requests)))
+    elapsed = time.perf_counter() - started
+    latencies = sorted(latencies)
+    return {
+        "p50": statistics.median(latencies),
+        "p95": latencies[int(len(latencies) * 0.95) - 1],
+        "rps": requests / elapsed,
+    }
+
+
+async def main(requests: int, concurrency: int):
+    print(f"📊 {requests} requests per case, {concurrency} concurrent\n")
+    print(f"{'query':<26}{'session':<12}{'p50 ms':>9}{'p95 ms':>9}{'req/s':>10}")
+    for name, query in QUERIES.items():
+        results = {}
+        for label, factory in (("read-write", AsyncSessionLocal), ("read-only", ReadSessionLocal)):
+            results[label] = await run(factory, query, requests, concurrency)
+            r = results[label]
+            print(f"{name:<26}{label:<12}{r['p50']:>9.2f}{r['p95']:>9.2f}{r['rps']:>10.0f}")
+        saved = results["read-write"]["p50"] - results["read-only"]["p50"]
+        print(f"{'':<26}{'saved':<12}{saved:>9.2f}\n")
+    await engine.dispose()
+    await read_engine.dispose()
+
+
+if __name__ == "__main__":
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Benchmark read-only vs read-write sessions")
+    parser.add_argument("--requests", type=int, default=2000)
+    parser.add_argument("--concurrency", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.requests, args.concurrency))
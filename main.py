@@ -1,16 +1,17 @@
-from fastapi import FastAPI, Depends, HTTPException, status, Query, UploadFile, File, Form,Body
+from fastapi import FastAPI, Depends, HTTPException, status, Query, UploadFile, File, Form,Body, Header, Response
 from sqlalchemy.ext.asyncio import AsyncSession
 from sqlalchemy.future import select
-from sqlalchemy import and_, func
+from sqlalchemy import and_, or_, func, text
 from typing import List, Optional
 from pydantic import BaseModel, EmailStr, validator
+import os
 import re
-import random
 import json
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, date
 from fastapi.security import OAuth2PasswordBearer
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import JSONResponse, StreamingResponse
 import math
 from sqlalchemy.orm import selectinload
 import asyncio
@@ -25,15 +26,34 @@ import numpy as np
 from image_predict import original_class_labels,model
 from predict_text import predict_department_from_text
 
-from app import models
-from app.database import get_db, engine, AsyncSessionLocal
-from app.models import Report, User, Category, Status
-from app.schemas import UserCreate, UserResponse, UserLogin,MapStatsResponse,MapIssuesResponse,MapIssueResponse  
+from app.database import get_db, get_read_db, get_primary_read_db, engine, read_engine, AsyncSessionLocal, ReadSessionLocal
+from app.models import Report, User, Category, Status, ReportTombstone, GridCellRollup, counted_reports
+from app.schemas import UserCreate, UserResponse, UserLogin,MapStatsResponse,MapIssuesResponse,MapIssueResponse,HeatmapResponse  
 from app.auth_utils import get_password_hash, verify_password, create_access_token, SECRET_KEY, ALGORITHM    
+from app.sync import parse_since, get_sync_upper_bound, get_deleted_ids, encode_sync_cursor, sync_page, split_sync_page
+from app.pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, NEXT_CURSOR_HEADER, paginate, split_page
+from app.export import EXPORT_FORMATS, naive_utc, parse_export_columns, stream_reports_export
+from app.projections import MAP_ISSUE_COLUMNS, ADMIN_ISSUE_COLUMNS, RECENT_REPORT_COLUMNS, AUTO_ASSIGNED_COLUMNS, DASHBOARD_RECENT_COLUMNS, rows_as_dicts
+from app.map_format import COLUMNAR_COLUMNS, build_columnar_payload
+from app.rollups import GRID_LEVELS, CONFIDENCE_SCALE, apply_report_changes, snapshot_report, read_counters, reconcile_counters
+from app.geo import rings_bounds, points_in_polygon, polyline_bounds, points_near_polyline
+from app.wards import get_ward_index
+from app.aggregates import DEPARTMENT_DISPLAY_NAMES, DEPARTMENT_IDS, load_department_snapshot, load_department_trends
+from app.timebuckets import PERIOD_UNITS, bucket_label, count_by_bucket
+from app.cache import cached, cache_metrics
+from app.singleflight import coalesced
+from app.snapshot import SNAPSHOT_ENABLED, from_snapshot, run_snapshot_writer
+from app.etags import reports_etag, etag_matches, not_modified
+from app.migrations import check_schema
+from app.archive import load_archived_report
+from app.statements import REPORT_BY_ID, USER_BY_EMAIL, STATUS_BY_NAME, statement_cache_metrics
+from app.write_buffer import WRITE_BUFFER_ENABLED, insert_report_rows, report_write_buffer
+from app.ingest import INGEST_MAX_ROWS, ingest_reports
+from app.bulk import UPDATED, NOT_FOUND, REFERENCED, bulk_update_reports, bulk_delete_reports, group_outcomes
 
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="login")
 
-from predict_text import predict_department_from_text
+from predict_text import predict_department_from_text, predict_departments_from_texts
 from image_predict import predict_image, preprocess_image
 
 class UserCreateEnhanced(BaseModel):
@@ -150,10 +170,66 @@ class ReportCreate(BaseModel):
 
 app = FastAPI(title="Smart Urban Issue Redressal API", version="0.1.0")
 
+# Seconds between counter reconciliation runs in the API; 0 (the default)
+# leaves it to `maintenance.py reconcile-counters`, which docker-compose's
+# maintenance service runs daily (see README for cron). A run blocks
+# report writes while it recounts, so keep it rare.
+COUNTER_RECONCILE_INTERVAL = int(os.getenv("COUNTER_RECONCILE_INTERVAL_SECONDS", "0"))
+
+# Advisory lock electing the one worker that reconciles
+COUNTER_RECONCILE_LOCK_ID = 4703
+
+async def reconcile_counters_periodically(interval: int):
+    """
+    Every worker runs this; the one holding the advisory lock recounts the
+    dashboard counters every interval seconds, correcting any drift from
+    writes that bypassed apply_report_changes. The others keep retrying so
+    one takes over if the reconciler dies.
+    """
+    async with engine.connect() as lock_conn:
+        while True:
+            result = await lock_conn.execute(
+                text("SELECT pg_try_advisory_lock(:lock_id)"), {"lock_id": COUNTER_RECONCILE_LOCK_ID}
+            )
+            elected = result.scalar()
+            # Session-level lock: it outlives the transaction, which must not sit idle
+            await lock_conn.commit()
+            if elected:
+                break
+            await asyncio.sleep(interval)
+
+        print(f"✅ Elected counter reconciler (pid {os.getpid()})")
+        while True:
+            # Wait first, so a deploy does not start with a recount
+            await asyncio.sleep(interval)
+            try:
+                async with AsyncSessionLocal() as session:
+                    drift = await reconcile_counters(session)
+                    await session.commit()
+                if drift:
+                    print(f"⚠️ Corrected {len(drift)} drifted report counters: {sorted(drift)}")
+            except Exception as e:
+                print(f"❌ Counter reconciliation failed: {e}")
+
 @app.on_event("startup")
 async def on_startup():
-    async with engine.begin() as conn:
-        await conn.run_sync(models.Base.metadata.create_all)
+    # DDL is left to `maintenance.py migrate`; workers only compare fingerprints
+    async with engine.connect() as conn:
+        await check_schema(conn)
+    # Load ward boundaries up front so the first report doesn't pay for it
+    get_ward_index()
+    if SNAPSHOT_ENABLED:
+        # Workers elect one snapshot writer; the rest only read the file
+        app.state.snapshot_writer = asyncio.create_task(run_snapshot_writer())
+    if COUNTER_RECONCILE_INTERVAL > 0:
+        app.state.counter_reconciler = asyncio.create_task(
+            reconcile_counters_periodically(COUNTER_RECONCILE_INTERVAL)
+        )
+
+@app.on_event("shutdown")
+async def on_shutdown():
+    # Commit reports still waiting in the group-commit buffer
+    await report_write_buffer.drain()
 
 # Configure CORS
 app.add_middleware(
@@ -180,7 +256,7 @@ async def get_current_user(token: str = Depends(oauth2_scheme), db: AsyncSession
     except JWTError:
         raise credentials_exception
     
-    result = await db.execute(select(User).filter(User.email == email))
+    result = await db.execute(USER_BY_EMAIL, {"email": email})
     user = result.scalar_one_or_none()
     if user is None:
         raise credentials_exception
@@ -232,7 +308,7 @@ async def initialize_database(db: AsyncSession = Depends(get_db)):
                 db.add(status)
         
         # Create default admin user
-        result = await db.execute(select(User).filter(User.email == "admin@urbanissues.com"))
+        result = await db.execute(USER_BY_EMAIL, {"email": "admin@urbanissues.com"})
         admin_user_exists = result.scalar_one_or_none()
         if not admin_user_exists:
             admin_user = User(
@@ -257,19 +333,26 @@ async def initialize_database(db: AsyncSession = Depends(get_db)):
 
 @app.get("/reports/", response_model=List[dict])
 async def read_reports(
-    skip: int = Query(0, ge=0, description="Number of records to skip"),
-    limit: int = Query(100, ge=1, le=1000, description="Number of records to return"),
-    db: AsyncSession = Depends(get_db)
+    response: Response,
+    skip: int = Query(0, ge=0, description="Number of records to skip; prefer after, which does not degrade with depth"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of records to return"),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
+    db: AsyncSession = Depends(get_read_db)
 ):
-    result = await db.execute(select(Report).offset(skip).limit(limit))
-    reports = result.scalars().all()
+    try:
+        stmt = paginate(select(Report), "created", after, limit, descending=False)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    if skip:
+        stmt = stmt.offset(skip)
+    result = await db.execute(stmt)
+    reports, next_cursor = split_page(result.scalars().all(), "created", limit, descending=False)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return reports
 
 @app.post("/reports/")
-async def create_report(
-    report_data: ReportCreate,
-    db: AsyncSession = Depends(get_db)
-):
+async def create_report(report_data: ReportCreate):
     try:
         # Validate location data
         if not report_data.location_lat or not report_data.location_long:
@@ -279,7 +362,7 @@ async def create_report(
             )
 
         # ✅ FIXED: Use report_data attributes directly (it's a Pydantic model)
-        db_report = Report(
+        row = dict(
             user_name=report_data.user_name,
             user_mobile=report_data.user_mobile,
             user_email=report_data.user_email,
@@ -291,15 +374,22 @@ async def create_report(
             location_lat=report_data.location_lat,
             location_long=report_data.location_long,
             location_address=report_data.location_address,
+            ward=get_ward_index().lookup(report_data.location_lat, report_data.location_long),
             status="Pending",
             department=report_data.department or "other",
             auto_assigned=report_data.auto_assigned or False,
             prediction_confidence=report_data.prediction_confidence
         )
 
-        db.add(db_report)
-        await db.commit()
-        await db.refresh(db_report)
+        # INSERT ... RETURNING hands back the generated columns without a refresh
+        if WRITE_BUFFER_ENABLED:
+            # Shares an insert and commit with reports arriving at the same moment
+            db_report = await report_write_buffer.insert(row)
+        else:
+            # A session only on this path; the buffer uses its own
+            async with AsyncSessionLocal() as db:
+                db_report = (await insert_report_rows(db, [row]))[0]
+                await db.commit()
         
         return {
             "message": "Report created successfully!",
@@ -308,13 +398,13 @@ async def create_report(
             "location_provided": True,
             "department": db_report.department,
             "auto_assigned": db_report.auto_assigned,
-            "prediction_confidence": db_report.prediction_confidence
+            "prediction_confidence": db_report.prediction_confidence,
+            "ward": db_report.ward
         }
         
     except HTTPException:
         raise
     except Exception as e:
-        await db.rollback()
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,  
             detail=f"Error creating report: {str(e)}"
@@ -324,9 +414,9 @@ async def create_report(
 @app.get("/reports/{report_id}")
 async def get_report(
     report_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    result = await db.execute(select(Report).filter(Report.id == report_id))
+    result = await db.execute(REPORT_BY_ID, {"report_id": report_id})
     db_report = result.scalar_one_or_none()
     
     if db_report is None:
@@ -344,7 +434,7 @@ async def update_report_status(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
-    result = await db.execute(select(Report).filter(Report.id == report_id))
+    result = await db.execute(REPORT_BY_ID, {"report_id": report_id})
     db_report = result.scalar_one_or_none()
     
     if db_report is None:
@@ -353,7 +443,7 @@ async def update_report_status(
             detail=f"Report with ID {report_id} not found"
         )
     
-    result = await db.execute(select(Status).filter(Status.name == new_status))
+    result = await db.execute(STATUS_BY_NAME, {"name": new_status})
     status = result.scalar_one_or_none()
     if not status:
         raise HTTPException(
@@ -361,7 +451,9 @@ async def update_report_status(
             detail=f"Status '{new_status}' is not valid"
         )
     
+    before = snapshot_report(db_report)
     db_report.status_id = status.id
+    await apply_report_changes(db, [(before, snapshot_report(db_report))])
     await db.commit()
     await db.refresh(db_report)
     
@@ -373,7 +465,7 @@ async def delete_report(
     db: AsyncSession = Depends(get_db),
     current_user: User = Depends(get_current_admin)
 ):
-    result = await db.execute(select(Report).filter(Report.id == report_id))
+    result = await db.execute(REPORT_BY_ID, {"report_id": report_id})
     db_report = result.scalar_one_or_none()
     
     if db_report is None:
@@ -382,7 +474,9 @@ async def delete_report(
             detail=f"Report with ID {report_id} not found"
         )
     
+    await apply_report_changes(db, [(snapshot_report(db_report), None)])
     await db.delete(db_report)
+    db.add(ReportTombstone(report_id=report_id))
     await db.commit()
     
     return {"message": f"Report with ID {report_id} has been successfully deleted."}
@@ -396,7 +490,7 @@ async def get_urgency_levels():
 @app.post("/api/users/register", response_model=UserResponse)
 async def signup(user_data: UserCreateEnhanced, db: AsyncSession = Depends(get_db)):
     # Check if user already exists
-    result = await db.execute(select(User).filter(User.email == user_data.email))
+    result = await db.execute(USER_BY_EMAIL, {"email": user_data.email})
     existing_user = result.scalar_one_or_none()
     if existing_user:
         raise HTTPException(
@@ -441,7 +535,7 @@ async def signup(user_data: UserCreateEnhanced, db: AsyncSession = Depends(get_d
 @app.post("/login")
 async def login(login_data: UserLogin, db: AsyncSession = Depends(get_db)):
     # Find user by email
-    result = await db.execute(select(User).filter(User.email == login_data.email))
+    result = await db.execute(USER_BY_EMAIL, {"email": login_data.email})
     user = result.scalar_one_or_none()
     
     # Verify password
@@ -472,23 +566,32 @@ async def read_users_me(current_user: User = Depends(get_current_user)):
 # Get current user's reports
 @app.get("/users/me/reports")
 async def read_own_reports(
+    response: Response,
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of reports per page"),
+    after: Optional[str] = Query(None, description="Cursor from the X-Next-Cursor header of the previous page"),
     current_user: User = Depends(get_current_user),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
-    result = await db.execute(select(Report).filter(Report.user_id == current_user.id))
-    user_reports = result.scalars().all()
+    try:
+        stmt = paginate(select(Report).filter(Report.user_id == current_user.id), "created", after, limit)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    result = await db.execute(stmt)
+    user_reports, next_cursor = split_page(result.scalars().all(), "created", limit)
+    if next_cursor:
+        response.headers[NEXT_CURSOR_HEADER] = next_cursor
     return user_reports
 
 # Get all categories
 @app.get("/categories")
-async def get_categories(db: AsyncSession = Depends(get_db)):
+async def get_categories(db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(Category))
     categories = result.scalars().all()
     return categories
 
 # Get all statuses
 @app.get("/statuses")
-async def get_statuses(db: AsyncSession = Depends(get_db)):
+async def get_statuses(db: AsyncSession = Depends(get_read_db)):
     result = await db.execute(select(Status))
     statuses = result.scalars().all()
     return statuses
@@ -498,11 +601,12 @@ async def get_statuses(db: AsyncSession = Depends(get_db)):
 # some extra end points
 
 @app.get("/dashboard/summary")
-async def get_dashboard_summary(db: AsyncSession = Depends(get_db)):
+@cached(ttl=30, stale=60)
+async def get_dashboard_summary(db: AsyncSession = Depends(get_read_db)):
     
     try:
-        # Get total reports in system
-        total_reports_result = await db.execute(select(func.count(Report.id)))
+        # Get total reports in system, archived ones included
+        total_reports_result = await db.execute(select(func.count()).select_from(counted_reports()))
         total_reports_count = total_reports_result.scalar()
 
         # Get today's resolved issues count
@@ -517,11 +621,11 @@ async def get_dashboard_summary(db: AsyncSession = Depends(get_db)):
 
         # Get recent reports (public)
         recent_reports_result = await db.execute(
-            select(Report)
+            select(*DASHBOARD_RECENT_COLUMNS)
             .order_by(Report.created_at.desc())
             .limit(5)
         )
-        recent_reports = recent_reports_result.scalars().all()
+        recent_reports = rows_as_dicts(recent_reports_result.all())
 
         return {
             "message": "Welcome to UrbanSim AI - Make your city better today",
@@ -544,7 +648,7 @@ async def get_nearby_issues(
     lat: float = Query(..., description="User latitude"),
     long: float = Query(..., description="User longitude"),
     radius_km: float = Query(5.0, description="Search radius in km"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
 
     try:
@@ -616,7 +720,7 @@ async def get_nearby_issues(
         )
 
 @app.get("/reports/resolved/today")
-async def get_todays_resolved_issues(db: AsyncSession = Depends(get_db)):
+async def get_todays_resolved_issues(db: AsyncSession = Depends(get_read_db)):
     
     try:
         today = date.today()
@@ -670,7 +774,9 @@ async def get_todays_resolved_issues(db: AsyncSession = Depends(get_db)):
         )
 
 @app.get("/activity/today")
-async def get_todays_activity(db: AsyncSession = Depends(get_db)):
+@from_snapshot("activity_today")
+@cached(ttl=30, stale=60)
+async def get_todays_activity(db: AsyncSession = Depends(get_read_db)):
     """
     Returns today's public activity feed (no auth required)
     """
@@ -693,7 +799,7 @@ async def get_todays_activity(db: AsyncSession = Depends(get_db)):
                 "title": f"New {report.issue_type} issue reported",
                 "description": report.title,
                 "urgency": report.issue_type,
-                "category": report.category.name if report.category else "General",
+                "category": report.category or "General",
                 "timestamp": report.created_at,
                 "location": report.location_address
             })
@@ -714,7 +820,7 @@ async def get_todays_activity(db: AsyncSession = Depends(get_db)):
                 "type": "issue_resolved", 
                 "title": f"{report.issue_type} issue resolved",
                 "description": f"'{report.title}' has been fixed",
-                "category": report.category.name if report.category else "General",
+                "category": report.category or "General",
                 "timestamp": report.updated_at,
                 "location": report.location_address
             })
@@ -737,13 +843,13 @@ async def get_todays_activity(db: AsyncSession = Depends(get_db)):
 @app.get("/reports/{report_id}/confirmations")
 async def get_issue_confirmations(
     report_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get confirmation count for an issue (public - no auth required)
     """
     try:
-        report_result = await db.execute(select(Report).filter(Report.id == report_id))
+        report_result = await db.execute(REPORT_BY_ID, {"report_id": report_id})
         report = report_result.scalar_one_or_none()
         
         if not report:
@@ -768,46 +874,40 @@ async def get_issue_confirmations(
         )
 
 @app.get("/dashboard/stats")
-async def get_dashboard_stats(db: AsyncSession = Depends(get_db)):
+@from_snapshot("dashboard_stats")
+@cached(ttl=30, stale=60)
+async def get_dashboard_stats(db: AsyncSession = Depends(get_read_db)):
     """
     Returns public dashboard statistics (no auth required)
     """
     try:
-        # Total reports count
-        total_reports_result = await db.execute(select(func.count(Report.id)))
-        total_reports = total_reports_result.scalar()
-        
-        # Resolved reports count
-        resolved_reports_result = await db.execute(
-            select(func.count(Report.id))
-            .join(Status)
-            .filter(Status.name == "Resolved")
-        )
-        resolved_reports = resolved_reports_result.scalar()
-        
-        # In progress reports count
-        in_progress_result = await db.execute(
-            select(func.count(Report.id))
-            .join(Status)
-            .filter(Status.name == "In Progress")
-        )
-        in_progress_reports = in_progress_result.scalar()
-        
+        # All counts come from the maintained counters; only the small
+        # status and category lookup tables are read
+        counters = await read_counters(db, names=["total"], prefixes=["status_id:", "category_id:", "issue_type:"])
+        total_reports = counters.get("total", 0)
+
+        status_result = await db.execute(select(Status.id, Status.name))
+        status_counts = {}
+        for status_id, status_name in status_result.all():
+            status_counts[status_name] = status_counts.get(status_name, 0) + counters.get(f"status_id:{status_id}", 0)
+        resolved_reports = status_counts.get("Resolved", 0)
+        in_progress_reports = status_counts.get("In Progress", 0)
+
         # Category-wise counts
-        category_stats_result = await db.execute(
-            select(Category.name, func.count(Report.id))
-            .select_from(Report)
-            .join(Category)
-            .group_by(Category.name)
-        )
-        category_stats = category_stats_result.all()
-        
+        category_result = await db.execute(select(Category.id, Category.name))
+        category_counts = {}
+        for category_id, category_name in category_result.all():
+            count = counters.get(f"category_id:{category_id}", 0)
+            if count:
+                category_counts[category_name] = category_counts.get(category_name, 0) + count
+        category_stats = list(category_counts.items())
+
         # Urgency level counts
-        urgency_stats_result = await db.execute(
-            select(Report.issue_type, func.count(Report.id))
-            .group_by(Report.issue_type)
-        )
-        urgency_stats = urgency_stats_result.all()
+        urgency_stats = [
+            (name[len("issue_type:"):], count)
+            for name, count in counters.items()
+            if name.startswith("issue_type:") and count
+        ]
         
         return {
             "total_reports": total_reports,
@@ -825,15 +925,18 @@ async def get_dashboard_stats(db: AsyncSession = Depends(get_db)):
         )
 
 @app.get("/reports/category-summary")
-async def get_category_summary(db: AsyncSession = Depends(get_db)):
+@from_snapshot("category_summary")
+@cached(ttl=60, stale=120)
+async def get_category_summary(db: AsyncSession = Depends(get_read_db)):
     """
     Returns count of issues per category (public - no auth required)
     """
     try:
+        reports = counted_reports()
         result = await db.execute(
-            select(Category.name, Category.description, func.count(Report.id))
-            .select_from(Report)
-            .join(Category)
+            select(Category.name, Category.description, func.count(reports.c.id))
+            .select_from(reports)
+            .join(Category, Category.id == reports.c.category_id)
             .group_by(Category.name, Category.description)
         )
         category_summary = result.all()
@@ -855,68 +958,95 @@ async def get_category_summary(db: AsyncSession = Depends(get_db)):
             detail=f"Error fetching category summary: {str(e)}"
         )
     
+# Statuses counted as "active" in My Complaints; reports without a status show as "Reported"
+ACTIVE_COMPLAINT_STATUSES = ["Reported", "In Progress"]
+
+def select_user_complaints(user_email: str):
+    """
+    A user's reports with category and status names resolved by outer joins,
+    as plain rows with just the fields My Complaints shows.
+    """
+    return (
+        select(
+            Report.id,
+            Report.title,
+            Report.description,
+            Report.created_at,
+            Report.urgency_level,
+            Report.location_address,
+            Report.user_name,
+            Report.user_email,
+            Category.name.label("category_name"),
+            Status.name.label("status_name"),
+        )
+        .select_from(Report)
+        .outerjoin(Category, Category.id == Report.category_id)
+        .outerjoin(Status, Status.id == Report.status_id)
+        .where(Report.user_email == user_email)
+    )
+
 @app.get("/users/reports/filtered")
 async def get_user_reports_filtered(
+    response: Response,
     status_filter: str = Query("all", description="Filter by status: all, active, resolved"),
     user_email: str = Query(..., description="User email to filter reports"),
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of reports per page"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     try:
+        stmt = select_user_complaints(user_email)
+        if status_filter == "active":
+            stmt = stmt.where(or_(Status.name.is_(None), Status.name.in_(ACTIVE_COMPLAINT_STATUSES)))
+        elif status_filter == "resolved":
+            stmt = stmt.where(Status.name == "Resolved")
+        count_stmt = select(func.count()).select_from(stmt.subquery())
+        try:
+            stmt = paginate(stmt, "created", after, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
+
+        etag = await reports_etag(db, "user-reports", {
+            "status_filter": status_filter, "user_email": user_email, "limit": limit, "after": after
+        })
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+
         print(f"🔍 Fetching reports for user: {user_email}, filter: {status_filter}")
         
-        result = await db.execute(
-            select(Report)
-            .filter(Report.user_email == user_email)
-            .order_by(Report.created_at.desc())
-        )
-        reports = result.scalars().all()
-        print(f"✅ Found {len(reports)} reports for user {user_email}")
+        result = await db.execute(stmt)
+        reports, next_cursor = split_page(result.all(), "created", limit)
+        total_complaints = (await db.execute(count_stmt)).scalar()
+        print(f"✅ Found {len(reports)} of {total_complaints} reports for user {user_email}")
 
         formatted = []
         for r in reports:
-            # category
-            category = None
-            if r.category_id:
-                cat_res = await db.execute(select(Category).filter(Category.id == r.category_id))
-                category = cat_res.scalar_one_or_none()
-
-            # status
-            status_obj = None
-            if r.status_id:
-                stat_res = await db.execute(select(Status).filter(Status.id == r.status_id))
-                status_obj = stat_res.scalar_one_or_none()
-
-            # filtering
-            should_include = True
-            status_name = status_obj.name if status_obj else "Reported"
-
-            if status_filter == "active" and status_name not in ["Reported", "In Progress"]:
-                should_include = False
-            elif status_filter == "resolved" and status_name != "Resolved":
-                should_include = False
-
-            if should_include:
-                formatted.append({
-                    "id": r.id,
-                    "complaint_id": f"#{r.id:05d}",
-                    "title": r.title,
-                    "description": r.description,
-                    "date": r.created_at.strftime("%d %b. %I:%M %p") if r.created_at else None,
-                    "category": category.name if category else "General",
-                    "status": status_name,
-                    "urgency_level": r.urgency_level,
-                    "location_address": r.location_address,
-                    "user_name": r.user_name,
-                    "user_email": r.user_email
-                })
+            formatted.append({
+                "id": r.id,
+                "complaint_id": f"#{r.id:05d}",
+                "title": r.title,
+                "description": r.description,
+                "date": r.created_at.strftime("%d %b. %I:%M %p") if r.created_at else None,
+                "category": r.category_name or "General",
+                "status": r.status_name or "Reported",
+                "urgency_level": r.urgency_level,
+                "location_address": r.location_address,
+                "user_name": r.user_name,
+                "user_email": r.user_email
+            })
 
         return {
-            "total_complaints": len(formatted),
+            "total_complaints": total_complaints,
             "filter": status_filter,
             "user_email": user_email,
-            "complaints": formatted
+            "complaints": formatted,
+            "next_cursor": next_cursor
         }
 
+    except HTTPException:
+        raise
     except Exception as e:
         import traceback
         print(f"❌ Error: {e}")
@@ -931,7 +1061,7 @@ async def get_user_reports_filtered(
 async def search_user_reports(
     query: str = Query(..., description="Search by complaint ID or text"),
     user_email: str = Query(..., description="User email to search reports"),  # CHANGED BACK: Made mandatory
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Search user's reports by complaint ID or text
@@ -954,7 +1084,7 @@ async def search_user_reports(
                 complaint_id = None
         
         # Base query - user can only see their own reports
-        base_query = select(Report).filter(Report.user_email == user_email)
+        base_query = select_user_complaints(user_email)
         
         if complaint_id:
             # Search by exact ID
@@ -967,34 +1097,23 @@ async def search_user_reports(
                 Report.description.ilike(search_term)
             )
         
-        base_query = base_query.order_by(Report.created_at.desc())
+        base_query = base_query.order_by(Report.created_at.desc(), Report.id.desc())
         
         result = await db.execute(base_query)
-        search_results = result.scalars().all()
+        search_results = result.all()
         
         print(f"✅ Found {len(search_results)} search results")
         
         formatted_results = []
         for report in search_results:
-            # Get category and status for each report
-            category_result = await db.execute(
-                select(Category).filter(Category.id == report.category_id)
-            )
-            category = category_result.scalar_one_or_none()
-            
-            status_result = await db.execute(
-                select(Status).filter(Status.id == report.status_id)
-            )
-            status = status_result.scalar_one_or_none()
-            
             report_data = {
                 "id": report.id,
                 "complaint_id": f"#{report.id:05d}",
                 "title": report.title,
                 "description": report.description,
-                "date": report.created_at.strftime("%d %b. %I:%M %p"),
-                "category": category.name if category else "General",
-                "status": status.name if status else "Reported",
+                "date": report.created_at.strftime("%d %b. %I:%M %p") if report.created_at else None,
+                "category": report.category_name or "General",
+                "status": report.status_name or "Reported",
                 "location_address": report.location_address,
                 "user_name": report.user_name,
                 "user_email": report.user_email
@@ -1018,7 +1137,7 @@ async def search_user_reports(
 @app.get("/reports/{report_id}/timeline")
 async def get_report_timeline(
     report_id: int,
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Returns detailed report information with timeline
@@ -1028,7 +1147,7 @@ async def get_report_timeline(
         
         # Get report
         report_result = await db.execute(
-            select(Report).filter(Report.id == report_id)
+            REPORT_BY_ID, {"report_id": report_id}
         )
         report = report_result.scalar_one_or_none()
         
@@ -1150,11 +1269,55 @@ async def get_report_timeline(
 
 
 @app.get("/api/admin/issues")
-async def get_admin_issues(db: AsyncSession = Depends(get_db)):
+async def get_admin_issues(
+    response: Response,
+    since: Optional[str] = Query(None, description="Cursor from a previous response; returns only changes after it"),
+    ward: Optional[str] = Query(None, description="Only issues in this ward"),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of issues per page"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page; keep the first page's cursor for delta sync"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_primary_read_db)
+):
     try:
-        # Execute query using the session
-        result = await db.execute(select(Report))
-        issues = result.scalars().all()
+        try:
+            since_position = parse_since(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid since cursor")
+
+        # A 304 keeps the client's cached cursor, which is older than any
+        # change left out by the safety window, so nothing is skipped
+        etag = await reports_etag(db, "admin-issues", {"since": since, "ward": ward, "limit": limit, "after": after})
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+
+        upper = await get_sync_upper_bound(db)
+
+        # Execute query using the session; plain rows of the emitted columns
+        stmt = select(*ADMIN_ISSUE_COLUMNS)
+        if since_position:
+            # Ward is checked per row below, so reports that moved out of it
+            # are sent as removed
+            stmt = sync_page(stmt, since_position, upper, limit)
+        else:
+            if ward:
+                stmt = stmt.where(Report.ward == ward)
+            try:
+                stmt = paginate(stmt, "created", after, limit)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
+        result = await db.execute(stmt)
+
+        page_end = None
+        next_cursor = None
+        left_ward = []
+        if since_position:
+            issues, page_end = split_sync_page(result.all(), limit)
+            if ward:
+                left_ward = [issue.id for issue in issues if issue.ward != ward]
+                issues = [issue for issue in issues if issue.ward == ward]
+        else:
+            issues, next_cursor = split_page(result.all(), "created", limit)
         
         # Convert to list of dictionaries
         issues_list = []
@@ -1170,55 +1333,185 @@ async def get_admin_issues(db: AsyncSession = Depends(get_db)):
                 "urgency_level": issue.urgency_level,
                 "status": issue.status,
                 "location_address": issue.location_address,
+                "ward": issue.ward,
                 "assigned_department": issue.assigned_department,
                 "resolution_notes": issue.resolution_notes,
                 "images": issue.images,
                 "created_at": issue.created_at.isoformat() if issue.created_at else None,
                 "updated_at": issue.updated_at.isoformat() if issue.updated_at else None
             })
+
+        # A partial delta page ends at its last row; the next poll continues there
+        sync_end = page_end or (upper, 0)
+        deleted_ids = left_ward + await get_deleted_ids(db, since_position, sync_end[0]) if since_position else []
         
-        return {"issues": issues_list}
+        return {
+            "issues": issues_list,
+            "deleted_ids": deleted_ids,
+            "cursor": encode_sync_cursor(*sync_end),
+            "has_more": page_end is not None,
+            "next_cursor": next_cursor
+        }
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error fetching issues: {str(e)}")
         raise HTTPException(status_code=500, detail=f"Internal server error: {str(e)}")
 
+@app.get("/api/admin/reports/export")
+async def export_reports(
+    format: str = Query("ndjson", pattern="^(ndjson|csv)$", description="Output format: ndjson or csv"),
+    columns: Optional[str] = Query(None, description="Comma-separated columns; defaults to all exportable columns"),
+    status: Optional[str] = Query(None, description="Only reports with this status"),
+    department: Optional[str] = Query(None, description="Only reports of this department"),
+    urgency_level: Optional[str] = Query(None, description="Only reports with this urgency level"),
+    ward: Optional[str] = Query(None, description="Only reports in this ward"),
+    created_from: Optional[datetime] = Query(None, description="Only reports created at or after this time"),
+    created_to: Optional[datetime] = Query(None, description="Only reports created before this time")
+):
+    """
+    Streams reports as NDJSON or CSV from a server-side cursor, so memory use
+    stays flat and the first rows go out before the query has finished.
+    """
+    try:
+        selected = parse_export_columns(columns)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+    filters = []
+    if status:
+        filters.append(Report.status == status)
+    if department:
+        filters.append(Report.department == department)
+    if urgency_level:
+        filters.append(Report.urgency_level == urgency_level)
+    if ward:
+        filters.append(Report.ward == ward)
+    if created_from:
+        filters.append(Report.created_at >= naive_utc(created_from))
+    if created_to:
+        filters.append(Report.created_at < naive_utc(created_to))
+
+    return StreamingResponse(
+        stream_reports_export(selected, filters, format),
+        media_type=EXPORT_FORMATS[format],
+        headers={"Content-Disposition": f'attachment; filename="reports.{format}"'}
+    )
+
+@app.post("/api/admin/reports/ingest", response_model=schemas.ReportIngestResponse)
+async def ingest_reports_endpoint(request: schemas.ReportIngestRequest, db: AsyncSession = Depends(get_db)):
+    """
+    Bulk-imports reports, e.g. call center backlogs. Rows are validated one
+    by one; valid rows are inserted with COPY in one transaction and invalid
+    rows are returned with their errors.
+    """
+    if len(request.reports) > INGEST_MAX_ROWS:
+        raise HTTPException(
+            status_code=413,
+            detail=f"Cannot ingest more than {INGEST_MAX_ROWS} reports per request"
+        )
+    try:
+        predictor = predict_departments_from_texts if request.predict_departments else None
+        result = await ingest_reports(db, enumerate(request.reports, start=1), predictor)
+        await db.commit()
+        return schemas.ReportIngestResponse(
+            message=f"Ingested {len(result.report_ids)} of {len(request.reports)} reports",
+            inserted_count=len(result.report_ids),
+            report_ids=result.report_ids,
+            errors=[schemas.ReportIngestRowError(row=row, errors=errors) for row, errors in result.errors]
+        )
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Error ingesting reports: {str(e)}")
+
 # 2. Get Single Report Details
 @app.get("/api/admin/issues/{report_id}", response_model=schemas.ReportResponse)
-async def get_issue_details(report_id: int, db: AsyncSession = Depends(get_db)):
+async def get_issue_details(report_id: int, db: AsyncSession = Depends(get_read_db)):
     try:
         result = await db.execute(
-            select(models.Report).where(models.Report.id == report_id)
+            REPORT_BY_ID, {"report_id": report_id}
         )
         report = result.scalar_one_or_none()
+        if not report:
+            # Old resolved reports are moved to the archive
+            report = await load_archived_report(db, report_id)
         if not report:
             raise HTTPException(status_code=404, detail="Issue not found")
         return report
+    except HTTPException:
+        raise
+    except Exception as e:
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+# Bulk admin operations: each runs one UPDATE/DELETE ... WHERE id = ANY(...)
+# RETURNING in a single transaction and reports the outcome of every id.
+# Declared before the /{report_id} routes so "bulk" is not taken for an id.
+def bulk_response(message: str, outcomes: dict) -> schemas.BulkIssueResponse:
+    return schemas.BulkIssueResponse(
+        message=message,
+        requested_count=len(outcomes),
+        outcomes=group_outcomes(outcomes),
+    )
+
+@app.patch("/api/admin/issues/bulk/status", response_model=schemas.BulkIssueResponse)
+async def bulk_update_issue_status(update: schemas.BulkStatusUpdate, db: AsyncSession = Depends(get_db)):
+    try:
+        outcomes = await bulk_update_reports(db, update.issue_ids, status=update.status)
+        await db.commit()
+        return bulk_response(f"Status set to {update.status}", outcomes)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.patch("/api/admin/issues/bulk/assign", response_model=schemas.BulkIssueResponse)
+async def bulk_assign_to_department(assign_data: schemas.BulkDepartmentAssign, db: AsyncSession = Depends(get_db)):
+    try:
+        outcomes = await bulk_update_reports(db, assign_data.issue_ids, assigned_department=assign_data.department)
+        await db.commit()
+        return bulk_response(f"Issues assigned to {assign_data.department}", outcomes)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.post("/api/admin/issues/bulk/resolve", response_model=schemas.BulkIssueResponse)
+async def bulk_resolve_issues(resolve_data: schemas.BulkResolveIssues, db: AsyncSession = Depends(get_db)):
+    try:
+        outcomes = await bulk_update_reports(
+            db,
+            resolve_data.issue_ids,
+            status="Resolved",
+            resolution_notes=resolve_data.resolution_notes,
+            resolved_by=resolve_data.resolved_by,
+        )
+        await db.commit()
+        return bulk_response("Issues resolved", outcomes)
+    except Exception as e:
+        await db.rollback()
+        raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
+
+@app.post("/api/admin/issues/bulk/delete", response_model=schemas.BulkIssueResponse)
+async def bulk_delete_issues(delete_data: schemas.BulkIssueIds, db: AsyncSession = Depends(get_db)):
+    try:
+        outcomes = await bulk_delete_reports(db, delete_data.issue_ids)
+        await db.commit()
+        return bulk_response("Issues deleted", outcomes)
     except Exception as e:
+        await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
 # 3. Update Report Status - CORRECTED FOR STRING STATUS
 @app.patch("/api/admin/issues/{report_id}/status")
 async def update_issue_status(report_id: int, status_update: schemas.StatusUpdate, db: AsyncSession = Depends(get_db)):
     try:
-        # Get the report
-        result = await db.execute(
-            select(models.Report).where(models.Report.id == report_id)
-        )
-        report = result.scalar_one_or_none()
-        
-        if not report:
+        outcomes = await bulk_update_reports(db, [report_id], status=status_update.status)
+        if outcomes[report_id] == NOT_FOUND:
             raise HTTPException(status_code=404, detail="Issue not found")
-        
-        # Update the status directly as string
-        report.status = status_update.status
-        report.updated_at = datetime.utcnow()
-        
-        # Commit the changes
         await db.commit()
-        await db.refresh(report)
         
         return {"message": "Status updated successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -1227,41 +1520,32 @@ async def update_issue_status(report_id: int, status_update: schemas.StatusUpdat
 @app.patch("/api/admin/issues/{report_id}/assign")
 async def assign_to_department(report_id: int, assign_data: schemas.DepartmentAssign, db: AsyncSession = Depends(get_db)):
     try:
-        result = await db.execute(
-            select(models.Report).where(models.Report.id == report_id)
-        )
-        report = result.scalar_one_or_none()
-        
-        if not report:
+        outcomes = await bulk_update_reports(db, [report_id], assigned_department=assign_data.department)
+        if outcomes[report_id] == NOT_FOUND:
             raise HTTPException(status_code=404, detail="Issue not found")
-        
-        report.assigned_department = assign_data.department
-        report.updated_at = datetime.utcnow()
-        
         await db.commit()
-        await db.refresh(report)
         
         return {"message": "Issue assigned to department successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
 
-# 5. Delete Report - CORRECTED (no changes needed here)
+# 5. Delete Report
 @app.delete("/api/admin/issues/{report_id}")
 async def delete_issue(report_id: int, db: AsyncSession = Depends(get_db)):
     try:
-        result = await db.execute(
-            select(models.Report).where(models.Report.id == report_id)
-        )
-        report = result.scalar_one_or_none()
-        
-        if not report:
+        outcomes = await bulk_delete_reports(db, [report_id])
+        if outcomes[report_id] == NOT_FOUND:
             raise HTTPException(status_code=404, detail="Issue not found")
-        
-        await db.delete(report)
+        if outcomes[report_id] == REFERENCED:
+            raise HTTPException(status_code=409, detail="Issue has confirmations or activity and cannot be deleted")
         await db.commit()
         
         return {"message": "Issue deleted successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -1270,24 +1554,20 @@ async def delete_issue(report_id: int, db: AsyncSession = Depends(get_db)):
 @app.post("/api/admin/issues/{report_id}/resolve")
 async def resolve_issue(report_id: int, resolve_data: schemas.ResolveIssue, db: AsyncSession = Depends(get_db)):
     try:
-        result = await db.execute(
-            select(models.Report).where(models.Report.id == report_id)
-        )
-        report = result.scalar_one_or_none()
-        
-        if not report:
+        outcomes = await bulk_update_reports(
+            db,
+            [report_id],
+            status="Resolved",
+            resolution_notes=resolve_data.resolution_notes,
+            resolved_by=resolve_data.resolved_by,
+        )
+        if outcomes[report_id] == NOT_FOUND:
             raise HTTPException(status_code=404, detail="Issue not found")
-        
-        # Update status to Resolved as string
-        report.status = "Resolved"
-        report.resolution_notes = resolve_data.resolution_notes
-        report.resolved_by = resolve_data.resolved_by
-        report.updated_at = datetime.utcnow()
-        
         await db.commit()
-        await db.refresh(report)
         
         return {"message": "Issue resolved successfully"}
+    except HTTPException:
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Database error: {str(e)}")
@@ -1330,27 +1610,8 @@ def get_category_from_department(dept_name: str) -> str:
     }
     return category_mapping.get(dept_name, "General")
 
-def generate_trend_data(current_efficiency: float) -> List[float]:
-    """Generate realistic trend data based on current efficiency"""
-    base = max(50, current_efficiency - 20)
-    return [
-        round(base, 1),
-        round(base + 5, 1),
-        round(base + 10, 1), 
-        round(base + 15, 1),
-        round(base + 18, 1),
-        round(current_efficiency, 1)
-    ]
-
-def generate_efficiency_trend(dept_id: int) -> List[float]:
-    """Generate efficiency trend for a department"""
-    trends = {
-        1: [65, 72, 78, 82, 85, 88.3],
-        2: [70, 75, 80, 85, 90, 92.5],
-        3: [60, 62, 65, 68, 70, 72.8],
-        4: [75, 78, 80, 83, 86, 88.3]
-    }
-    return trends.get(dept_id, [70, 75, 78, 80, 82, 85])
+# Number of points on department trend charts
+TREND_POINTS = 6
 
 class DepartmentFeedbackRequest(BaseModel):
     department_id: int
@@ -1370,49 +1631,27 @@ class ResolveIssuesRequest(BaseModel):
 
 
 @app.get("/api/departments/summary")
+@coalesced
 async def get_departments_summary(
     period: str = Query("month", description="Time period: week, month, year"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get summary for all departments with REAL DATA from database
     """
     try:
-        # ✅ FIXED: Use actual department field from Report model
-        # Map database department values to display names
-        department_display_names = {
-            "water_dept": "Water Dept",
-            "road_dept": "Road Dept",
-            "sanitation_dept": "Sanitation Dept",
-            "electricity_dept": "Electricity Dept",
-            "other": "Other"
-        }
+        # One GROUP BY department, status query for every department
+        snapshot = await load_department_snapshot(db)
+        trends = await load_department_trends(db, PERIOD_UNITS.get(period, "month"), TREND_POINTS)
         
         departments_data = []
         
-        # Query each department's real data
-        for dept_key, dept_name in department_display_names.items():
-            # Get total issues for this department
-            total_result = await db.execute(
-                select(func.count(Report.id))
-                .where(Report.department == dept_key)
-            )
-            total_issues = total_result.scalar() or 0
-            
-            # Get status counts for this department
-            status_result = await db.execute(
-                select(Report.status, func.count(Report.id))
-                .where(Report.department == dept_key)
-                .group_by(Report.status)
-            )
-            status_counts = dict(status_result.all())
-            
-            resolved = status_counts.get("Resolved", 0)
-            pending = status_counts.get("Pending", 0)
-            progress = status_counts.get("In Progress", 0)
+        for dept_key, dept_name in DEPARTMENT_DISPLAY_NAMES.items():
+            counts = snapshot.get(dept_key)
+            total_issues = counts.total
             
             # Calculate efficiency
-            efficiency = round((resolved / total_issues * 100) if total_issues > 0 else 0, 1)
+            efficiency = round(counts.efficiency, 1)
             
             # Only add departments that have issues
             if total_issues > 0:
@@ -1420,12 +1659,12 @@ async def get_departments_summary(
                     "id": len(departments_data) + 1,
                     "name": dept_name,
                     "icon": get_department_icon(dept_name),
-                    "resolved": resolved,
-                    "pending": pending,
-                    "progress": progress,
+                    "resolved": counts.resolved,
+                    "pending": counts.pending,
+                    "progress": counts.progress,
                     "efficiency": efficiency,
                     "total_issues": total_issues,
-                    "resolution_trend": generate_trend_data(efficiency)
+                    "resolution_trend": trends.efficiency_trend(dept_key)
                 })
         
         print(f"✅ Fetched real data for {len(departments_data)} departments")
@@ -1446,47 +1685,27 @@ async def get_departments_summary(
 @app.get("/api/departments/resolution-trends")
 async def get_resolution_trends(
     period: str = Query("month", description="Time period: week, month, year"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get REAL resolution trends from database
     """
     try:
-        department_display_names = {
-            "water_dept": "Water Dept",
-            "road_dept": "Road Dept",
-            "sanitation_dept": "Sanitation Dept",
-            "electricity_dept": "Electricity Dept"
-        }
+        unit = PERIOD_UNITS.get(period, "month")
+        snapshot = await load_department_trends(db, unit, TREND_POINTS)
+        labels = [bucket_label(start, unit) for start in snapshot.bucket_starts]
         
         trends = []
         
-        for dept_key, dept_name in department_display_names.items():
-            # Get total and resolved counts
-            total_result = await db.execute(
-                select(func.count(Report.id))
-                .where(Report.department == dept_key)
-            )
-            total = total_result.scalar() or 0
-            
-            resolved_result = await db.execute(
-                select(func.count(Report.id))
-                .where(Report.department == dept_key)
-                .where(Report.status == "Resolved")
-            )
-            resolved = resolved_result.scalar() or 0
-            
-            # Calculate current efficiency
-            current_efficiency = (resolved / total * 100) if total > 0 else 0
-            
-            # Generate realistic trend based on current efficiency
-            trend_data = generate_trend_data(current_efficiency)
+        for dept_key, dept_name in DEPARTMENT_DISPLAY_NAMES.items():
+            if dept_key == "other":
+                continue
             
-            if total > 0:  # Only include departments with data
+            if snapshot.get(dept_key).total > 0:  # Only include departments with data
                 trends.append({
                     "department": dept_name,
-                    "data": trend_data,
-                    "months": ["Jan", "Feb", "Mar", "Apr", "May", "Jun"]
+                    "data": snapshot.efficiency_trend(dept_key),
+                    "months": labels
                 })
         
         print(f"✅ Resolution trends: {len(trends)} departments")
@@ -1504,40 +1723,27 @@ async def get_resolution_trends(
 async def get_department_details(
     dept_id: int,
     period: str = Query("month", description="Time period: week, month, year"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get REAL detailed information for a specific department
     """
     try:
-        # Map department IDs to database keys
-        id_to_dept = {
-            1: ("water_dept", "Water Dept"),
-            2: ("road_dept", "Road Dept"),
-            3: ("sanitation_dept", "Sanitation Dept"),
-            4: ("electricity_dept", "Electricity Dept"),
-            5: ("other", "Other")
-        }
-        
-        if dept_id not in id_to_dept:
+        if dept_id not in DEPARTMENT_IDS:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Department not found"
             )
         
-        dept_key, dept_name = id_to_dept[dept_id]
+        dept_key = DEPARTMENT_IDS[dept_id]
+        dept_name = DEPARTMENT_DISPLAY_NAMES[dept_key]
         
         # Get REAL statistics from database
-        status_result = await db.execute(
-            select(Report.status, func.count(Report.id))
-            .where(Report.department == dept_key)
-            .group_by(Report.status)
-        )
-        status_counts = dict(status_result.all())
+        counts = (await load_department_snapshot(db)).get(dept_key)
         
-        resolved = status_counts.get("Resolved", 0)
-        pending = status_counts.get("Pending", 0)
-        progress = status_counts.get("In Progress", 0)
+        resolved = counts.resolved
+        pending = counts.pending
+        progress = counts.progress
         total_issues = resolved + pending + progress
         
         efficiency = round((resolved / total_issues * 100) if total_issues > 0 else 0, 1)
@@ -1551,7 +1757,9 @@ async def get_department_details(
             "progress": progress,
             "efficiency": efficiency,
             "total_issues": total_issues,
-            "efficiency_trend": generate_efficiency_trend(dept_id),
+            "efficiency_trend": (
+                await load_department_trends(db, PERIOD_UNITS.get(period, "month"), TREND_POINTS)
+            ).efficiency_trend(dept_key),
             "breakdown": {
                 "resolved_percentage": round((resolved / total_issues * 100) if total_issues > 0 else 0, 1),
                 "pending_percentage": round((pending / total_issues * 100) if total_issues > 0 else 0, 1),
@@ -1572,29 +1780,18 @@ async def get_department_details(
 @app.get("/api/departments/issues/by-department")
 async def get_issues_by_department(
     period: str = Query("month", description="Time period: week, month, year"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get REAL issues count per department for bar chart
     """
     try:
-        department_display_names = {
-            "water_dept": "Water Dept",
-            "road_dept": "Road Dept",
-            "sanitation_dept": "Sanitation Dept",
-            "electricity_dept": "Electricity Dept",
-            "other": "Other"
-        }
+        snapshot = await load_department_snapshot(db)
         
         data = []
         
-        for dept_key, dept_name in department_display_names.items():
-            # Get real count from database
-            count_result = await db.execute(
-                select(func.count(Report.id))
-                .where(Report.department == dept_key)
-            )
-            count = count_result.scalar() or 0
+        for dept_key, dept_name in DEPARTMENT_DISPLAY_NAMES.items():
+            count = snapshot.get(dept_key).total
             
             # Only include departments with issues
             if count > 0:
@@ -1653,30 +1850,32 @@ async def update_issues_status(
     Bulk update issues status for a department
     """
     try:
-        # Update issues in database
-        for issue_id in update.issue_ids:
-            result = await db.execute(
-                select(Report).filter(Report.id == issue_id)
+        # Get status ID for the new status
+        status_result = await db.execute(
+            STATUS_BY_NAME, {"name": update.new_status}
+        )
+        status_obj = status_result.scalar_one_or_none()
+        if not status_obj:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Status '{update.new_status}' is not valid"
             )
-            report = result.scalar_one_or_none()
-            if report:
-                # Get status ID for the new status
-                status_result = await db.execute(
-                    select(Status).filter(Status.name == update.new_status)
-                )
-                status_obj = status_result.scalar_one_or_none()
-                if status_obj:
-                    report.status_id = status_obj.id
-                    report.updated_at = datetime.utcnow()
         
+        # One UPDATE for all issues
+        outcomes = await bulk_update_reports(db, update.issue_ids, status_id=status_obj.id)
         await db.commit()
         
+        grouped = group_outcomes(outcomes)
+        updated_count = len(grouped.get(UPDATED, []))
         return {
-            "message": f"Updated {len(update.issue_ids)} issues to {update.new_status}",
-            "updated_count": len(update.issue_ids),
-            "department_id": update.department_id
+            "message": f"Updated {updated_count} issues to {update.new_status}",
+            "updated_count": updated_count,
+            "department_id": update.department_id,
+            "not_found_ids": grouped.get(NOT_FOUND, [])
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         await db.rollback()
         raise HTTPException(
@@ -1688,53 +1887,30 @@ async def update_issues_status(
 async def get_department_efficiency_trend(
     dept_id: int,
     months: int = Query(6, ge=1, le=12, description="Number of months for trend"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get efficiency trend for a specific department
     """
     try:
-        id_to_dept = {
-            1: ("water_dept", "Water Dept"),
-            2: ("road_dept", "Road Dept"),
-            3: ("sanitation_dept", "Sanitation Dept"),
-            4: ("electricity_dept", "Electricity Dept"),
-            5: ("other", "Other")
-        }
-        
-        if dept_id not in id_to_dept:
+        if dept_id not in DEPARTMENT_IDS:
             raise HTTPException(
                 status_code=status.HTTP_404_NOT_FOUND,
                 detail="Department not found"
             )
         
-        dept_key, dept_name = id_to_dept[dept_id]
+        dept_key = DEPARTMENT_IDS[dept_id]
         
         # Get current efficiency
-        total_result = await db.execute(
-            select(func.count(Report.id))
-            .where(Report.department == dept_key)
-        )
-        total = total_result.scalar() or 0
-        
-        resolved_result = await db.execute(
-            select(func.count(Report.id))
-            .where(Report.department == dept_key)
-            .where(Report.status == "Resolved")
-        )
-        resolved = resolved_result.scalar() or 0
+        current_efficiency = (await load_department_snapshot(db)).get(dept_key).efficiency
         
-        current_efficiency = (resolved / total * 100) if total > 0 else 0
-        
-        # Generate trend based on current efficiency
-        trend_data = generate_trend_data(current_efficiency)
-        
-        month_names = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+        # Monthly efficiency of the reports created in each month
+        trends = await load_department_trends(db, "month", months)
         
         return {
             "department_id": dept_id,
-            "efficiency_trend": trend_data[-months:],
-            "months": month_names[-months:],
+            "efficiency_trend": trends.efficiency_trend(dept_key),
+            "months": [bucket_label(start, "month") for start in trends.bucket_starts],
             "current_efficiency": current_efficiency
         }
         
@@ -1750,7 +1926,7 @@ async def get_department_efficiency_trend(
 @app.get("/debug/check-user-reports")
 async def debug_check_user_reports(
     user_email: str = Query(..., description="User email to check"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Debug endpoint to check exact user reports (FIXED isoformat error)
@@ -1846,7 +2022,7 @@ class UserProfileUpdate(BaseModel):
 @app.get("/api/users/profile", response_model=UserProfileResponse)
 async def get_user_profile_by_email(
     email: str = Query(..., description="User email address"),
-    db: AsyncSession = Depends(get_db)
+    db: AsyncSession = Depends(get_read_db)
     # REMOVED: current_user: User = Depends(get_current_user)
 ):
     """
@@ -1854,7 +2030,7 @@ async def get_user_profile_by_email(
     """
     try:
         # Find user by email
-        result = await db.execute(select(User).filter(User.email == email))
+        result = await db.execute(USER_BY_EMAIL, {"email": email})
         user = result.scalar_one_or_none()
         
         if not user:
@@ -1894,7 +2070,7 @@ async def update_user_profile(
     """
     try:
         # Find user by email
-        result = await db.execute(select(User).filter(User.email == email))
+        result = await db.execute(USER_BY_EMAIL, {"email": email})
         user = result.scalar_one_or_none()
         
         if not user:
@@ -1984,38 +2160,120 @@ async def update_user_profile_by_id(
     
 # Add these endpoints to your main.py
 
+def matches_map_filter(report_status, report_urgency, report_ward, status_filter, urgency_filter, ward_filter) -> bool:
+    """Checks a row against the map's status/urgency/ward filters"""
+    if status_filter and (report_status or "Pending") != status_filter:
+        return False
+    if urgency_filter and (report_urgency or "Medium") != urgency_filter:
+        return False
+    if ward_filter and report_ward != ward_filter:
+        return False
+    return True
+
 @app.get("/api/admin/map/issues", response_model=MapIssuesResponse)
 async def get_map_issues(
+    response: Response,
     status: Optional[str] = None,
     category: Optional[str] = None,
-    db: AsyncSession = Depends(get_db)
+    since: Optional[str] = Query(None, description="Cursor from a previous response; returns only changes after it"),
+    format: str = Query("objects", pattern="^(objects|columnar)$", description="Response layout: objects or columnar"),
+    ward: Optional[str] = Query(None, description="Only issues in this ward"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of issues per page"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    if_none_match: Optional[str] = Header(None),
+    db: AsyncSession = Depends(get_primary_read_db)
 ):
     """
     Get all issues with coordinates for map display
     """
     try:
-        # Build query - ensure coordinates exist
-        stmt = select(Report).where(
+        try:
+            since_position = parse_since(since)
+        except ValueError:
+            raise HTTPException(status_code=400, detail="Invalid since cursor")
+
+        etag = await reports_etag(db, "map-issues", {
+            "status": status, "category": category, "since": since, "format": format, "ward": ward,
+            "limit": limit, "after": after
+        })
+        if etag_matches(if_none_match, etag):
+            return not_modified(etag)
+        response.headers["ETag"] = etag
+
+        upper = await get_sync_upper_bound(db)
+        columnar = format == "columnar"
+
+        # Build query - ensure coordinates exist. Columnar rows carry the
+        # timestamps too, as page cursors are taken from them, and every row
+        # carries its ward for the delta-mode filter
+        stmt = (
+            select(*COLUMNAR_COLUMNS, Report.created_at, Report.updated_at, Report.ward) if columnar
+            else select(*MAP_ISSUE_COLUMNS, Report.ward)
+        )
+        stmt = stmt.where(
             Report.location_lat.isnot(None), 
             Report.location_long.isnot(None)
         )
-        
-        # Filter by status if provided
-        if status and status.lower() != "all":
-            stmt = stmt.where(Report.status == status)
-        
-        # Filter by urgency level (not category) if provided
-        if category and category.lower() != "all":
-            # Actually filtering by urgency_level based on your Flutter code
-            stmt = stmt.where(Report.urgency_level == category)
+
+        status_filter = status if status and status.lower() != "all" else None
+        urgency_filter = category if category and category.lower() != "all" else None
+
+        if since_position:
+            # Delta mode: fetch every changed row so reports that left the
+            # filtered set (assign-wards can move them) can be reported as removed
+            stmt = sync_page(stmt, since_position, upper, limit)
+        else:
+            if ward:
+                stmt = stmt.where(Report.ward == ward)
+
+            # Filter by status if provided
+            if status_filter:
+                stmt = stmt.where(Report.status == status_filter)
+            
+            # Filter by urgency level (not category) if provided
+            if urgency_filter:
+                # Actually filtering by urgency_level based on your Flutter code
+                stmt = stmt.where(Report.urgency_level == urgency_filter)
+
+            try:
+                stmt = paginate(stmt, "created", after, limit)
+            except ValueError as e:
+                raise HTTPException(status_code=400, detail=str(e))
         
         # Execute query
         result = await db.execute(stmt)
-        reports = result.scalars().all()
+        rows = result.all()
+
+        page_end = None
+        next_cursor = None
+        if since_position:
+            rows, page_end = split_sync_page(rows, limit)
+        else:
+            rows, next_cursor = split_page(rows, "created", limit)
+        sync_end = page_end or (upper, 0)
+
+        deleted_ids = []
+        if since_position:
+            kept = []
+            for row in rows:
+                if matches_map_filter(row.status, row.urgency_level, row.ward, status_filter, urgency_filter, ward):
+                    kept.append(row)
+                else:
+                    deleted_ids.append(row.id)
+            rows = kept
+            deleted_ids.extend(await get_deleted_ids(db, since_position, sync_end[0]))
+
+        cursor = encode_sync_cursor(*sync_end)
+        has_more = page_end is not None
+
+        if columnar:
+            # Plain rows straight into arrays, no per-row model validation
+            payload = build_columnar_payload(rows, deleted_ids, cursor, has_more, next_cursor)
+            return JSONResponse(content=payload, headers={"ETag": etag})
         
         # Format response - handle None values gracefully
         map_issues = []
-        for report in reports:
+        for report in rows:
             try:
                 map_issues.append(MapIssueResponse(
                     id=report.id,
@@ -2033,8 +2291,16 @@ async def get_map_issues(
                 print(f"Error processing report {report.id}: {str(e)}")
                 continue
         
-        return MapIssuesResponse(issues=map_issues)
+        return MapIssuesResponse(
+            issues=map_issues,
+            deleted_ids=deleted_ids,
+            cursor=cursor,
+            has_more=has_more,
+            next_cursor=next_cursor
+        )
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_map_issues: {str(e)}")
         raise HTTPException(
@@ -2049,7 +2315,10 @@ async def get_issues_in_bounds(
     south: float,
     east: float,
     west: float,
-    db: AsyncSession = Depends(get_db)
+    format: str = Query("objects", pattern="^(objects|columnar)$", description="Response layout: objects or columnar"),
+    limit: int = Query(MAX_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of issues per page"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get issues within specific geographic bounds
@@ -2066,17 +2335,29 @@ async def get_issues_in_bounds(
                 status_code=400, 
                 detail="East must be greater than west"
             )
+
+        columnar = format == "columnar"
         
         # Build query with bounds
-        stmt = select(Report).where(
+        stmt = select(*COLUMNAR_COLUMNS, Report.created_at) if columnar else select(*MAP_ISSUE_COLUMNS)
+        stmt = stmt.where(
             Report.location_lat.isnot(None),
             Report.location_long.isnot(None),
             Report.location_lat.between(south, north),
             Report.location_long.between(west, east)
         )
+        try:
+            stmt = paginate(stmt, "created", after, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         result = await db.execute(stmt)
-        reports = result.scalars().all()
+
+        if columnar:
+            rows, next_cursor = split_page(result.all(), "created", limit)
+            return JSONResponse(content=build_columnar_payload(rows, next_cursor=next_cursor))
+
+        reports, next_cursor = split_page(result.all(), "created", limit)
         
         # Format response
         map_issues = []
@@ -2098,8 +2379,10 @@ async def get_issues_in_bounds(
                 print(f"Error processing report {report.id}: {str(e)}")
                 continue
         
-        return MapIssuesResponse(issues=map_issues)
+        return MapIssuesResponse(issues=map_issues, next_cursor=next_cursor)
         
+    except HTTPException:
+        raise
     except Exception as e:
         print(f"Error in get_issues_in_bounds: {str(e)}")
         raise HTTPException(
@@ -2108,52 +2391,264 @@ async def get_issues_in_bounds(
         )
 
 
-@app.get("/api/admin/map/stats", response_model=MapStatsResponse)
-async def get_map_stats(db: AsyncSession = Depends(get_db)):
+@app.get("/api/admin/map/heatmap", response_model=HeatmapResponse)
+async def get_map_heatmap(
+    resolution: int = Query(2, ge=min(GRID_LEVELS), le=max(GRID_LEVELS), description="Grid level: 1 (~11 km), 2 (~1.1 km), 3 (~110 m)"),
+    department: Optional[str] = None,
+    status: Optional[str] = None,
+    north: Optional[float] = None,
+    south: Optional[float] = None,
+    east: Optional[float] = None,
+    west: Optional[float] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
     """
-    Get statistics for map view
+    Get complaint density per grid cell, read from the grid rollups
     """
     try:
-        # Count total issues with coordinates
-        stmt_total = select(Report).where(
-            Report.location_lat.isnot(None),
-            Report.location_long.isnot(None)
+        scale = GRID_LEVELS[resolution]
+        report_count = func.sum(GridCellRollup.report_count)
+
+        stmt = (
+            select(GridCellRollup.cell_lat, GridCellRollup.cell_long, report_count)
+            .where(GridCellRollup.level == resolution)
+            .group_by(GridCellRollup.cell_lat, GridCellRollup.cell_long)
+            .having(report_count > 0)
         )
-        result_total = await db.execute(stmt_total)
-        total_issues = len(result_total.scalars().all())
-        
-        # Count by status - Pending
-        stmt_pending = select(Report).where(
-            Report.status == "Pending",
-            Report.location_lat.isnot(None),
-            Report.location_long.isnot(None)
+
+        if department and department.lower() != "all":
+            stmt = stmt.where(GridCellRollup.department == department)
+        if status and status.lower() != "all":
+            stmt = stmt.where(GridCellRollup.status == status)
+
+        bounds = (north, south, east, west)
+        if any(bound is not None for bound in bounds):
+            if any(bound is None for bound in bounds):
+                raise HTTPException(status_code=400, detail="Provide all of north, south, east and west")
+            stmt = stmt.where(
+                GridCellRollup.cell_lat.between(math.floor(south * scale), math.floor(north * scale)),
+                GridCellRollup.cell_long.between(math.floor(west * scale), math.floor(east * scale))
+            )
+
+        result = await db.execute(stmt)
+
+        cells = []
+        for cell_lat, cell_long, count in result.all():
+            cells.append({
+                # Cell centre, so markers sit in the middle of the square
+                "lat": round((cell_lat + 0.5) / scale, 6),
+                "long": round((cell_long + 0.5) / scale, 6),
+                "count": int(count)
+            })
+
+        return {
+            "resolution": resolution,
+            "cell_size_deg": 1 / scale,
+            "total_count": sum(cell["count"] for cell in cells),
+            "max_count": max((cell["count"] for cell in cells), default=0),
+            "cells": cells
+        }
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in get_map_heatmap: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching heatmap: {str(e)}"
         )
-        result_pending = await db.execute(stmt_pending)
-        pending_issues = len(result_pending.scalars().all())
-        
-        # Count by status - In Progress
-        stmt_in_progress = select(Report).where(
-            Report.status == "In Progress",
-            Report.location_lat.isnot(None),
-            Report.location_long.isnot(None)
+
+
+OPEN_STATUSES = ["Pending", "In Progress"]
+
+async def query_map_issues_in_shape(db: AsyncSession, bounds, mask_fn, status_filter, department, format):
+    """
+    Bounding-box prefilter in SQL, then an exact vectorized shape test on the
+    candidate coordinates. Full rows are only loaded for the matches.
+    """
+    south, north, west, east = bounds
+    stmt = select(*COLUMNAR_COLUMNS).where(
+        Report.location_lat.between(south, north),
+        Report.location_long.between(west, east)
+    )
+    if status_filter and status_filter.lower() == "open":
+        stmt = stmt.where(Report.status.in_(OPEN_STATUSES))
+    elif status_filter and status_filter.lower() != "all":
+        stmt = stmt.where(Report.status == status_filter)
+    if department and department.lower() != "all":
+        stmt = stmt.where(Report.department == department)
+
+    result = await db.execute(stmt)
+    rows = result.all()
+    if rows:
+        lats = np.fromiter((row.location_lat for row in rows), dtype=float, count=len(rows))
+        longs = np.fromiter((row.location_long for row in rows), dtype=float, count=len(rows))
+        mask = mask_fn(lats, longs)
+        rows = [row for row, keep in zip(rows, mask) if keep]
+
+    if format == "columnar":
+        return JSONResponse(content=build_columnar_payload(rows))
+    if not rows:
+        return MapIssuesResponse(issues=[])
+
+    result = await db.execute(
+        select(*MAP_ISSUE_COLUMNS).where(Report.id.in_([row.id for row in rows])).order_by(Report.id)
+    )
+    map_issues = [
+        MapIssueResponse(
+            id=report.id,
+            title=report.title or "Untitled Issue",
+            status=report.status or "Pending",
+            urgency_level=report.urgency_level or "Medium",
+            location_lat=report.location_lat,
+            location_long=report.location_long,
+            description=report.description,
+            created_at=report.created_at or datetime.utcnow(),
+            user_email=report.user_email,
+            location_address=report.location_address
+        )
+        for report in result.all()
+    ]
+    return MapIssuesResponse(issues=map_issues)
+
+
+@app.post("/api/admin/map/issues-in-polygon", response_model=MapIssuesResponse)
+async def get_issues_in_polygon(
+    query: schemas.PolygonQueryRequest,
+    format: str = Query("objects", pattern="^(objects|columnar)$", description="Response layout: objects or columnar"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get issues inside a polygon (e.g. a ward boundary), holes excluded
+    """
+    try:
+        rings = [query.polygon] + (query.holes or [])
+        return await query_map_issues_in_shape(
+            db,
+            rings_bounds([query.polygon]),
+            lambda lats, longs: points_in_polygon(lats, longs, rings),
+            query.status,
+            query.department,
+            format
         )
-        result_in_progress = await db.execute(stmt_in_progress)
-        in_progress_issues = len(result_in_progress.scalars().all())
-        
-        # Count by status - Resolved
-        stmt_resolved = select(Report).where(
-            Report.status == "Resolved",
-            Report.location_lat.isnot(None),
-            Report.location_long.isnot(None)
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in get_issues_in_polygon: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching polygon issues: {str(e)}"
+        )
+
+
+@app.post("/api/admin/map/issues-along-route", response_model=MapIssuesResponse)
+async def get_issues_along_route(
+    query: schemas.RouteCorridorRequest,
+    format: str = Query("objects", pattern="^(objects|columnar)$", description="Response layout: objects or columnar"),
+    db: AsyncSession = Depends(get_db)
+):
+    """
+    Get issues within buffer_m metres of a road polyline
+    """
+    try:
+        return await query_map_issues_in_shape(
+            db,
+            polyline_bounds(query.path, query.buffer_m),
+            lambda lats, longs: points_near_polyline(lats, longs, query.path, query.buffer_m),
+            query.status,
+            query.department,
+            format
+        )
+
+    except HTTPException:
+        raise
+    except Exception as e:
+        print(f"Error in get_issues_along_route: {str(e)}")
+        raise HTTPException(
+            status_code=500,
+            detail=f"Error fetching route issues: {str(e)}"
+        )
+
+
+@app.get("/api/wards")
+async def get_wards():
+    """
+    List ward names from the loaded boundaries file
+    """
+    return {"wards": get_ward_index().names}
+
+
+@app.get("/api/wards/summary")
+async def get_wards_summary(
+    department: Optional[str] = None,
+    db: AsyncSession = Depends(get_read_db)
+):
+    """
+    Issue counts per ward and status, archived reports included
+    """
+    try:
+        reports = counted_reports()
+        stmt = (
+            select(reports.c.ward, reports.c.status, func.count(reports.c.id))
+            .group_by(reports.c.ward, reports.c.status)
+        )
+        if department and department.lower() != "all":
+            stmt = stmt.where(reports.c.department == department)
+
+        result = await db.execute(stmt)
+
+        wards = {}
+        for ward_name, report_status, count in result.all():
+            ward_name = ward_name or "Unassigned"
+            entry = wards.setdefault(ward_name, {
+                "ward": ward_name,
+                "total_issues": 0,
+                "pending": 0,
+                "in_progress": 0,
+                "resolved": 0
+            })
+            entry["total_issues"] += count
+            if report_status == "Resolved":
+                entry["resolved"] += count
+            elif report_status == "In Progress":
+                entry["in_progress"] += count
+            elif report_status in (None, "Pending"):
+                entry["pending"] += count
+
+        summary = sorted(wards.values(), key=lambda x: x["total_issues"], reverse=True)
+        for entry in summary:
+            total = entry["total_issues"]
+            entry["efficiency"] = round((entry["resolved"] / total * 100) if total > 0 else 0, 1)
+
+        return {"wards": summary, "department": department or "all"}
+
+    except Exception as e:
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching ward summary: {str(e)}"
         )
-        result_resolved = await db.execute(stmt_resolved)
-        resolved_issues = len(result_resolved.scalars().all())
+
+
+@app.get("/api/admin/map/stats", response_model=MapStatsResponse)
+async def get_map_stats(db: AsyncSession = Depends(get_read_db)):
+    """
+    Get statistics for map view
+    """
+    try:
+        # Issues with coordinates, total and by status, from the counters
+        counters = await read_counters(db, names=[
+            "located",
+            "located:status:Pending",
+            "located:status:In Progress",
+            "located:status:Resolved",
+        ])
         
         return MapStatsResponse(
-            total_issues=total_issues,
-            pending_issues=pending_issues,
-            in_progress_issues=in_progress_issues,
-            resolved_issues=resolved_issues
+            total_issues=counters.get("located", 0),
+            pending_issues=counters.get("located:status:Pending", 0),
+            in_progress_issues=counters.get("located:status:In Progress", 0),
+            resolved_issues=counters.get("located:status:Resolved", 0)
         )
         
     except Exception as e:
@@ -2167,31 +2662,18 @@ async def get_map_stats(db: AsyncSession = Depends(get_db)):
 # Add these to your FastAPI backend
 
 @app.get("/api/admin/dashboard/stats")
-async def get_admin_dashboard_stats(db: AsyncSession = Depends(get_db)):
+@cached(ttl=10, stale=30)
+async def get_admin_dashboard_stats(db: AsyncSession = Depends(get_read_db)):
     """
     Get real-time statistics for admin dashboard
     """
     try:
-        # Total reports count
-        total_reports_result = await db.execute(select(func.count(Report.id)))
-        total_reports = total_reports_result.scalar() or 0
-        
-        # Resolved reports count
-        resolved_reports_result = await db.execute(
-            select(func.count(Report.id)).where(Report.status == "Resolved")
-        )
-        resolved_reports = resolved_reports_result.scalar() or 0
-        
-        # Pending reports count
-        pending_reports_result = await db.execute(
-            select(func.count(Report.id)).where(Report.status == "Pending")
-        )
-        pending_reports = pending_reports_result.scalar() or 0
+        counters = await read_counters(db, names=["total", "status:Resolved", "status:Pending"])
         
         return {
-            "total_issues": total_reports,
-            "resolved_issues": resolved_reports,
-            "pending_issues": pending_reports,
+            "total_issues": counters.get("total", 0),
+            "resolved_issues": counters.get("status:Resolved", 0),
+            "pending_issues": counters.get("status:Pending", 0),
             "last_updated": datetime.utcnow().isoformat()
         }
         
@@ -2202,59 +2684,30 @@ async def get_admin_dashboard_stats(db: AsyncSession = Depends(get_db)):
         )
 
 @app.get("/api/admin/dashboard/monthly-trends")
-async def get_monthly_trends(db: AsyncSession = Depends(get_db)):
+@cached(ttl=300, stale=600)
+async def get_monthly_trends(db: AsyncSession = Depends(get_read_db)):
     """
     Get monthly trends data for the last 6 months
     """
     try:
-        # Get current date and calculate last 6 months
-        current_date = datetime.utcnow()
-        monthly_data = []
-        
-        for i in range(5, -1, -1):
-            # Calculate month start and end
-            month_date = current_date.replace(day=1) - timedelta(days=30*i)
-            month_start = month_date.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
-            if month_date.month == 12:
-                month_end = month_date.replace(year=month_date.year+1, month=1, day=1)
-            else:
-                month_end = month_date.replace(month=month_date.month+1, day=1)
-            month_end = month_end - timedelta(days=1)
-            
-            # Get issues for this month
-            monthly_issues_result = await db.execute(
-                select(func.count(Report.id))
-                .where(Report.created_at >= month_start)
-                .where(Report.created_at <= month_end)
-            )
-            monthly_issues = monthly_issues_result.scalar() or 0
-            
-            monthly_data.append({
-                "month": month_date.strftime("%b"),
-                "issues": monthly_issues
-            })
+        # One grouped query over calendar months; closed months come from cache
+        buckets = await count_by_bucket(db, "month", 6, series="reports")
+        monthly_data = [
+            {"month": bucket_label(start, "month"), "issues": issues}
+            for start, issues in buckets
+        ]
         
         return {"monthly_trends": monthly_data}
         
     except Exception as e:
-        total_issues_result = await db.execute(select(func.count(Report.id)))
-        total_issues = total_issues_result.scalar() or 0
-        
-        base_issues = max(total_issues // 6, 10)
-        monthly_data = []
-        months = ["Jan", "Feb", "Mar", "Apr", "May", "Jun"]
-        
-        for i, month in enumerate(months):
-            monthly_issues = base_issues + random.randint(-10, 20)
-            monthly_data.append({
-                "month": month,
-                "issues": monthly_issues
-            })
-        
-        return {"monthly_trends": monthly_data}
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching monthly trends: {str(e)}"
+        )
 
 @app.get("/api/admin/dashboard/department-performance")
-async def get_department_performance(db: AsyncSession = Depends(get_db)):
+@cached(ttl=60, stale=120)
+async def get_department_performance(db: AsyncSession = Depends(get_read_db)):
     """
     Get department performance based on resolved issues
     """
@@ -2268,22 +2721,17 @@ async def get_department_performance(db: AsyncSession = Depends(get_db)):
             "other"              
         ]
         
+        snapshot = await load_department_snapshot(db)
+
+        # Departments found in the data but missing from the list above
+        actual_departments += [dept for dept in snapshot.departments if dept and dept not in actual_departments]
+        
         performance_data = []
         
         for dept in actual_departments:
-            # Total issues for this department
-            total_issues_result = await db.execute(
-                select(func.count(Report.id)).where(Report.department == dept)
-            )
-            total_issues = total_issues_result.scalar() or 0
-            
-            # Resolved issues for this department
-            resolved_issues_result = await db.execute(
-                select(func.count(Report.id))
-                .where(Report.department == dept)
-                .where(Report.status == "Resolved")
-            )
-            resolved_issues = resolved_issues_result.scalar() or 0
+            counts = snapshot.get(dept)
+            total_issues = counts.total
+            resolved_issues = counts.resolved
             
             # Calculate progress percentage
             progress = resolved_issues / total_issues if total_issues > 0 else 0
@@ -2306,54 +2754,24 @@ async def get_department_performance(db: AsyncSession = Depends(get_db)):
         
     except Exception as e:
         print(f"❌ Error in department performance: {e}")
-        # If error, get actual departments from database
-        departments_result = await db.execute(
-            select(Report.department).distinct().where(Report.department.isnot(None))
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"Error fetching department performance: {str(e)}"
         )
-        departments = departments_result.scalars().all()
-        
-        performance_data = []
-        for dept in departments:
-            if dept:
-                total_issues_result = await db.execute(
-                    select(func.count(Report.id)).where(Report.department == dept)
-                )
-                total_issues = total_issues_result.scalar() or 0
-                
-                resolved_issues_result = await db.execute(
-                    select(func.count(Report.id))
-                    .where(Report.department == dept)
-                    .where(Report.status == "Resolved")
-                )
-                resolved_issues = resolved_issues_result.scalar() or 0
-                
-                progress = resolved_issues / total_issues if total_issues > 0 else 0
-                
-                # ✅ Convert to display format
-                display_name = dept.replace("_", " ").title() if "_" in dept else dept
-                
-                performance_data.append({
-                    "department": display_name,
-                    "total_issues": total_issues,
-                    "resolved_issues": resolved_issues,
-                    "progress": round(progress, 2),
-                    "progress_percentage": round(progress * 100)
-                })
-        
-        return {"departments": performance_data}
 
 @app.get("/api/admin/dashboard/recent-reports")
-async def get_recent_reports(db: AsyncSession = Depends(get_db), limit: int = 4):
+@cached(ttl=10, stale=30)
+async def get_recent_reports(db: AsyncSession = Depends(get_read_db), limit: int = 4):
     """
     Get most recent reports for dashboard
     """
     try:
         recent_reports_result = await db.execute(
-            select(Report)
+            select(*RECENT_REPORT_COLUMNS)
             .order_by(Report.created_at.desc())
             .limit(limit)
         )
-        recent_reports = recent_reports_result.scalars().all()
+        recent_reports = recent_reports_result.all()
         
         formatted_reports = []
         for report in recent_reports:
@@ -2379,6 +2797,88 @@ async def get_recent_reports(db: AsyncSession = Depends(get_db), limit: int = 4)
             detail=f"Error fetching recent reports: {str(e)}"
         )
 
+# Sections of the admin dashboard bundle and the endpoints that build them
+DASHBOARD_BUNDLE_SECTIONS = {
+    "stats": get_admin_dashboard_stats,
+    "monthly_trends": get_monthly_trends,
+    "department_performance": get_department_performance,
+    "recent_reports": get_recent_reports,
+}
+
+async def run_in_own_session(endpoint, **kwargs):
+    """
+    Calls an endpoint function with a session of its own, so several can run
+    concurrently on separate pooled connections.
+    """
+    async with ReadSessionLocal() as session:
+        return await endpoint(db=session, **kwargs)
+
+@app.get("/api/admin/dashboard/bundle")
+async def get_admin_dashboard_bundle(
+    fields: Optional[str] = Query(None, description="Comma-separated sections to include; defaults to all"),
+    recent_limit: int = Query(4, ge=1, le=50, description="Number of recent reports")
+):
+    """
+    Returns the admin dashboard sections in one payload, each section being
+    the response of its own endpoint. Sections are fetched concurrently.
+    """
+    if fields:
+        sections = [field.strip() for field in fields.split(",") if field.strip()]
+        unknown = [field for field in sections if field not in DASHBOARD_BUNDLE_SECTIONS]
+        if unknown:
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail=f"Unknown fields: {', '.join(unknown)}. Valid fields: {', '.join(DASHBOARD_BUNDLE_SECTIONS)}"
+            )
+    else:
+        sections = list(DASHBOARD_BUNDLE_SECTIONS)
+
+    calls = []
+    for field in sections:
+        kwargs = {"limit": recent_limit} if field == "recent_reports" else {}
+        calls.append(run_in_own_session(DASHBOARD_BUNDLE_SECTIONS[field], **kwargs))
+    results = await asyncio.gather(*calls, return_exceptions=True)
+
+    # A failing section is reported on its own instead of failing the bundle
+    bundle = {}
+    errors = {}
+    for field, result in zip(sections, results):
+        if isinstance(result, HTTPException):
+            errors[field] = result.detail
+        elif isinstance(result, Exception):
+            errors[field] = str(result)
+        else:
+            bundle[field] = result
+    bundle["errors"] = errors
+    bundle["last_updated"] = datetime.utcnow().isoformat()
+    return bundle
+
+@app.get("/api/admin/metrics/cache")
+async def get_cache_metrics():
+    """
+    Response cache hit rates and size
+    """
+    return cache_metrics()
+
+@app.get("/api/admin/metrics/statement-cache")
+async def get_statement_cache_metrics():
+    """
+    Compiled SQL cache hit ratio and how full each engine's cache is
+    """
+    return statement_cache_metrics({"primary": engine, "read": read_engine})
+
+@app.get("/api/admin/metrics/write-buffer")
+async def get_write_buffer_metrics():
+    """
+    Group-commit batches, reports per batch and batches retried row by row
+    """
+    metrics = report_write_buffer.metrics
+    return {
+        "enabled": WRITE_BUFFER_ENABLED,
+        **metrics,
+        "avg_batch_size": round(metrics["reports"] / metrics["batches"], 2) if metrics["batches"] else 0
+    }
+
 def get_time_ago(timestamp: datetime) -> str:
     """Helper function to get human readable time ago"""
     now = datetime.utcnow()
@@ -2517,6 +3017,7 @@ async def auto_assign_departments(
         
         assigned_count = 0
         processed_count = 0
+        changes = []
         
         for issue in issues:
             try:
@@ -2535,9 +3036,11 @@ async def auto_assign_departments(
                     prediction_response.get('department') != 'other' and
                     prediction_response.get('confidence', 0) > 50):  # Minimum confidence threshold
                     
+                    before = snapshot_report(issue)
                     issue.department = prediction_response['department']
                     issue.auto_assigned = True
                     issue.prediction_confidence = prediction_response['confidence']
+                    changes.append((before, snapshot_report(issue)))
                     assigned_count += 1
                     
                     print(f"✅ Assigned issue {issue.id} to {issue.department} "
@@ -2550,6 +3053,7 @@ async def auto_assign_departments(
                 print(f"❌ Failed to process issue {issue.id}: {e}")
                 continue
         
+        await apply_report_changes(db, changes)
         await db.commit()
         
         return {
@@ -2566,43 +3070,33 @@ async def auto_assign_departments(
         await db.rollback()
         raise HTTPException(status_code=500, detail=f"Auto-assignment failed: {str(e)}")
 @app.get("/api/ai/assignment-status")
-async def get_assignment_status(db: AsyncSession = Depends(get_db)):
+async def get_assignment_status(db: AsyncSession = Depends(get_read_db)):
     """
     Get AI assignment statistics
     """
     try:
-        # Count auto-assigned issues
-        auto_assigned_result = await db.execute(
-            select(func.count(Report.id))
-            .where(Report.auto_assigned == True)
+        counters = await read_counters(
+            db,
+            names=["total", "department:other", "auto_assigned", "auto_assigned:confidence_count", "auto_assigned:confidence_sum"],
+            prefixes=["auto_assigned:department:"]
         )
-        auto_assigned_count = auto_assigned_result.scalar() or 0
-        
-        # Count total issues
-        total_result = await db.execute(select(func.count(Report.id)))
-        total_issues = total_result.scalar() or 0
-        
-        # Count unassigned issues
-        unassigned_result = await db.execute(
-            select(func.count(Report.id))
-            .where(Report.department == "other")
-        )
-        unassigned_count = unassigned_result.scalar() or 0
+        auto_assigned_count = counters.get("auto_assigned", 0)
+        total_issues = counters.get("total", 0)
+        unassigned_count = counters.get("department:other", 0)
         
         # Count by department for auto-assigned issues
-        dept_result = await db.execute(
-            select(Report.department, func.count(Report.id))
-            .where(Report.auto_assigned == True)
-            .group_by(Report.department)
-        )
-        dept_counts = dict(dept_result.all())
+        dept_counts = {
+            name[len("auto_assigned:department:"):]: count
+            for name, count in counters.items()
+            if name.startswith("auto_assigned:department:") and count
+        }
         
-        # Get average confidence for auto-assigned issues
-        confidence_result = await db.execute(
-            select(func.avg(Report.prediction_confidence))
-            .where(Report.auto_assigned == True)
+        # Average confidence for auto-assigned issues, summed in hundredths
+        confidence_count = counters.get("auto_assigned:confidence_count", 0)
+        avg_confidence = (
+            counters.get("auto_assigned:confidence_sum", 0) / CONFIDENCE_SCALE / confidence_count
+            if confidence_count > 0 else 0
         )
-        avg_confidence = confidence_result.scalar() or 0
         
         return {
             "auto_assigned_count": auto_assigned_count,
@@ -2621,13 +3115,15 @@ async def get_assignment_status(db: AsyncSession = Depends(get_db)):
 async def get_auto_assigned_issues(
     department: Optional[str] = None,
     period: str = "month",
-    db: AsyncSession = Depends(get_db)
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE, description="Number of issues per page"),
+    after: Optional[str] = Query(None, description="next_cursor from the previous page"),
+    db: AsyncSession = Depends(get_read_db)
 ):
     """
     Get list of auto-assigned issues for a specific department
     """
     try:
-        stmt = select(Report).where(Report.auto_assigned == True)
+        stmt = select(*AUTO_ASSIGNED_COLUMNS).where(Report.auto_assigned == True)
         
         if department and department != "all":
             stmt = stmt.where(Report.department == department)
@@ -2644,9 +3140,14 @@ async def get_auto_assigned_issues(
                 start_date = datetime.utcnow() - timedelta(days=365)
             
             stmt = stmt.where(Report.created_at >= start_date)
+
+        try:
+            stmt = paginate(stmt, "created", after, limit)
+        except ValueError as e:
+            raise HTTPException(status_code=400, detail=str(e))
         
         result = await db.execute(stmt)
-        issues = result.scalars().all()
+        issues, next_cursor = split_page(result.all(), "created", limit)
         
         issues_data = []
         for issue in issues:
@@ -2664,8 +3165,11 @@ async def get_auto_assigned_issues(
             "issues": issues_data,
             "count": len(issues_data),
             "department": department or "all",
-            "period": period
+            "period": period,
+            "next_cursor": next_cursor
         }
         
+    except HTTPException:
+        raise
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Failed to get auto-assigned issues: {str(e)}")
\ No newline at end of file
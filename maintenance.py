@@ -0,0 +1,192 @@
+# maintenance.py
+import argparse
+import asyncio
+import csv
+import itertools
+import json
+import time
+from dotenv import load_dotenv
+
+from sqlalchemy import update
+from sqlalchemy.future import select
+
+from app.database import AsyncSessionLocal, engine
+from app.models import Report
+from app.rollups import rebuild_grid_rollups, rebuild_daily_rollups, reconcile_counters, bump_reports_version, backfill_rollups
+from app.wards import get_ward_index
+from app.ingest import INGEST_BATCH_SIZE, ingest_reports
+from app.migrations import migrate_schema, stored_fingerprint
+from app.archive import ARCHIVE_AFTER_DAYS, archive_reports, archive_stats
+
+BATCH_SIZE = 5000
+
+
+async def migrate():
+    async with engine.connect() as conn:
+        previous = await stored_fingerprint(conn)
+    # Each DDL statement commits on its own; see migrate_schema
+    async with engine.connect() as conn:
+        conn = await conn.execution_options(isolation_level="AUTOCOMMIT")
+        fingerprint, applied = await migrate_schema(conn)
+    if previous == fingerprint and not applied:
+        print(f"✅ Schema already up to date ({fingerprint[:12]})")
+    else:
+        print(f"✅ Schema migrated: {previous[:12] if previous else 'none'} -> {fingerprint[:12]} ({applied} DDL statements)")
+
+    # Rollup tables new to an existing database start out empty
+    async with AsyncSessionLocal() as session:
+        filled = await backfill_rollups(session)
+    for table, rows in filled.items():
+        print(f"✅ Backfilled {table}: {rows} rows")
+
+
+async def rebuild_grid():
+    async with AsyncSessionLocal() as session:
+        cells = await rebuild_grid_rollups(session)
+        await session.commit()
+    print(f"✅ Grid rollups rebuilt: {cells} cells")
+
+
+async def rebuild_daily():
+    async with AsyncSessionLocal() as session:
+        rows = await rebuild_daily_rollups(session)
+        await session.commit()
+    print(f"✅ Daily rollups rebuilt: {rows} rows")
+
+
+async def reconcile_report_counters():
+    async with AsyncSessionLocal() as session:
+        drift = await reconcile_counters(session)
+        await session.commit()
+    for name, (stored, actual) in sorted(drift.items()):
+        print(f"  {name}: {stored} -> {actual}")
+    print(f"✅ Report counters reconciled: {len(drift)} corrected")
+
+
+async def assign_wards():
+    index = get_ward_index()
+    updated = 0
+    last_id = 0
+    async with AsyncSessionLocal() as session:
+        while True:
+            result = await session.execute(
+                select(Report.id, Report.location_lat, Report.location_long, Report.ward)
+                .where(Report.id > last_id)
+                .order_by(Report.id)
+                .limit(BATCH_SIZE)
+            )
+            rows = result.all()
+            if not rows:
+                break
+            last_id = rows[-1].id
+
+            changes = []
+            for row in rows:
+                ward = index.lookup(row.location_lat, row.location_long)
+                if ward != row.ward:
+                    changes.append({"id": row.id, "ward": ward})
+            if changes:
+                # Bulk UPDATE by primary key, one executemany per batch. The
+                # updated_at onupdate is rendered into it, so delta-sync clients
+                # see the move and drop the report from their old ward
+                await session.execute(update(Report), changes)
+                await bump_reports_version(session)
+                await session.commit()
+                updated += len(changes)
+    print(f"✅ Ward assignment finished: {updated} reports updated")
+
+
+async def archive(days: int):
+    moved = await archive_reports(days)
+    async with AsyncSessionLocal() as session:
+        archived, partitions = await archive_stats(session)
+    print(f"✅ Archived {moved} resolved reports; archive holds {archived} in {partitions} monthly partitions")
+
+
+def read_ingest_rows(path: str):
+    """
+    Yields (row number, raw row) from a .csv, .json (array) or NDJSON file.
+    """
+    if path.endswith(".csv"):
+        with open(path, newline="", encoding="utf-8") as f:
+            for number, row in enumerate(csv.DictReader(f), start=1):
+                # Empty CSV cells mean "not provided"
+                yield number, {key: value for key, value in row.items() if value != ""}
+    elif path.endswith(".json"):
+        with open(path, encoding="utf-8") as f:
+            yield from enumerate(json.load(f), start=1)
+    else:
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, start=1):
+                if line.strip():
+                    try:
+                        yield number, json.loads(line)
+                    except json.JSONDecodeError as e:
+                        yield number, f"Invalid JSON: {e}"
+
+
+async def ingest(path: str, predict: bool):
+    predictor = None
+    if predict:
+        from predict_text import predict_departments_from_texts
+        predictor = predict_departments_from_texts
+
+    rows = read_ingest_rows(path)
+    inserted = 0
+    failed = 0
+    started = time.monotonic()
+    async with AsyncSessionLocal() as session:
+        # Commit per batch: transactions stay bounded and an interrupted run keeps what it loaded
+        while True:
+            batch = list(itertools.islice(rows, INGEST_BATCH_SIZE))
+            if not batch:
+                break
+            result = await ingest_reports(session, batch, predictor)
+            await session.commit()
+            inserted += len(result.report_ids)
+            failed += len(result.errors)
+            for number, errors in result.errors:
+                print(f"  row {number}: {'; '.join(errors)}")
+            print(f"  {inserted} inserted, {failed} rejected")
+    elapsed = time.monotonic() - started
+    print(f"✅ Ingest finished: {inserted} reports inserted, {failed} rejected in {elapsed:.1f}s")
+
+
+COMMANDS = {
+    "migrate": (migrate, "Create or update tables, columns and indexes to match the models"),
+    "rebuild-grid": (rebuild_grid, "Recompute heatmap grid rollups from the reports table"),
+    "rebuild-daily": (rebuild_daily, "Backfill the daily department/status rollups behind trend charts"),
+    "reconcile-counters": (reconcile_report_counters, "Recount the dashboard counters and correct any drift"),
+    "assign-wards": (assign_wards, "Assign wards to existing reports from the boundaries file"),
+    "ingest": (ingest, "Bulk-import reports from a CSV, JSON or NDJSON file"),
+    "archive": (archive, "Move old resolved reports to the compressed, partitioned archive"),
+}
+
+# Arguments of commands that take any, passed to the job as keyword arguments
+COMMAND_ARGUMENTS = {
+    "ingest": [
+        (("path",), {"help": "File to import; .csv, .json or NDJSON"}),
+        (("--predict",), {"action": "store_true", "help": "Predict departments for rows without one"}),
+    ],
+    "archive": [
+        (("--days",), {"type": int, "default": ARCHIVE_AFTER_DAYS, "help": "Archive reports resolved more than this many days ago"}),
+    ],
+}
+
+
+def main():
+    load_dotenv()
+    parser = argparse.ArgumentParser(description="Maintenance jobs for the Smart Urban Issue Redressal API")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    for name, (_, help_text) in COMMANDS.items():
+        subparser = subparsers.add_parser(name, help=help_text)
+        for flags, options in COMMAND_ARGUMENTS.get(name, []):
+            subparser.add_argument(*flags, **options)
+
+    args = vars(parser.parse_args())
+    job, _ = COMMANDS[args.pop("command")]
+    asyncio.run(job(**args))
+
+
+if __name__ == "__main__":
+    main()
@@ -22,6 +22,16 @@ def predict_department_from_text(text):
     
     return pred, round(confidence, 2), top3
 
+def predict_departments_from_texts(texts):
+    # One vectorize/predict pass over a whole batch of complaints
+    vec = vectorizer.transform([text.lower().strip() for text in texts])
+    proba = clf.predict_proba(vec)
+    best = np.argmax(proba, axis=1)
+    return [
+        (clf.classes_[i], round(float(row[i]) * 100, 2))
+        for i, row in zip(best, proba)
+    ]
+
 if __name__ == "__main__":
     s = input("Enter complaint text: ")
     dept, conf, top3 = predict_department_from_text(s)